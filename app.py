@@ -63,7 +63,7 @@ def generate():
         openai_client = None
         if config.use_openai_drafts:
             openai_key = require_env('OPENAI_API_KEY')
-            openai_client = OpenAIDraftClient(openai_key, OpenAIDraftConfig(model=config.openai_model))
+            openai_client = OpenAIDraftClient(openai_key, OpenAIDraftConfig.from_agent_config(config))
         
         company = CompanyInput(name=company_name or domain, domain=normalize_domain(domain))
         
@@ -79,7 +79,7 @@ def generate():
         
         total_leads = len(leads)
         filtered = filter_leads(leads, config.target_roles, config.excluded_roles, config.min_email_confidence)
-        ranked = rank_leads(filtered)
+        ranked = rank_leads(filtered, seniority=config.seniority_for(domain_type))
         ordered_leads = [item.lead for item in ranked]
         
         if not ordered_leads:
@@ -95,6 +95,8 @@ def generate():
             openai_client=openai_client,
             custom_subject=custom_subject if custom_subject else None,
             resume_url=resume_url if resume_url else None,
+            max_workers=config.draft_workers,
+            reuse=config.draft_reuse,
         )
         
         write_markdown("send_sheet.md", ranked, drafts)
@@ -163,7 +165,7 @@ def batch():
     openai_client = None
     if config.use_openai_drafts:
         openai_key = require_env('OPENAI_API_KEY')
-        openai_client = OpenAIDraftClient(openai_key, OpenAIDraftConfig(model=config.openai_model))
+        openai_client = OpenAIDraftClient(openai_key, OpenAIDraftConfig.from_agent_config(config))
     
     for company_domain in companies:
         try:
@@ -178,6 +180,8 @@ def batch():
                     config.candidate_background_summary,
                     config.tone,
                     openai_client=openai_client,
+                    max_workers=config.draft_workers,
+                    reuse=config.draft_reuse,
                 )
                 all_ranked.extend(ranked)
                 all_drafts.extend(drafts)
@@ -1,7 +1,7 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, send_file, jsonify, session
 from flask_login import login_required, current_user, login_user
 import os
-import json
+import click
 from dotenv import load_dotenv
 from datetime import datetime
 from werkzeug.middleware.proxy_fix import ProxyFix
@@ -9,15 +9,17 @@ from werkzeug.middleware.proxy_fix import ProxyFix
 from pm_outreach_agent.hunter_client import HunterClient
 from pm_outreach_agent.multi_provider_finder import email_finder
 from pm_outreach_agent.lead_filter import filter_leads, rank_leads
-from pm_outreach_agent.email_generator import generate_emails
+from pm_outreach_agent.email_generator import generate_emails, personalize_draft
 from pm_outreach_agent.output_writer import write_markdown, write_csv
-from pm_outreach_agent.models import CompanyInput, Lead, EmailDraft
+from pm_outreach_agent.models import CompanyInput, EmailDraft
 from pm_outreach_agent.utils import load_config, require_env, normalize_domain
-from pm_outreach_agent.openai_client import OpenAIDraftClient, OpenAIDraftConfig
+from pm_outreach_agent.openai_client import OpenAIDraftClient, OpenAIDraftConfig, response_cache_key
+from pm_outreach_agent.openai_pool import openai_clients
 from pm_outreach_agent.gmail_client import create_gmail_drafts
+from pm_outreach_agent.discovery import discover_leads
 
 # Import SaaS components
-from database import db, init_db, User, Search, LeadCache
+from database import db, init_db, User, Search, LeadCache, LLMResponseCache, LLMResponseStore, start_lead_cache_compactor
 from auth import auth_bp, init_auth
 
 # Import Gmail service
@@ -54,6 +56,35 @@ app.register_blueprint(auth_bp)
 gmail_service.app = app
 gmail_service.credentials_path = os.path.join(os.path.dirname(__file__), 'credentials.json')
 
+# Cap concurrent calls per provider across all requests in this worker
+email_finder.provider_slots.configure(load_config('config.yaml').provider_concurrency)
+
+# Seed adaptive provider ordering and per-user rate limits from recent call history
+with app.app_context():
+    email_finder.warm_provider_stats()
+    email_finder.warm_rate_limiter()
+
+# Reuse OpenAI responses for identical prompts (hours, 0 disables), capped at a row count
+llm_cache = LLMResponseStore(
+    app,
+    ttl_seconds=int(float(os.getenv('LLM_CACHE_TTL_HOURS', '168')) * 3600),
+    max_rows=int(os.getenv('LLM_CACHE_MAX_ROWS', '5000')),
+)
+
+# Purge expired lead cache rows in the background (seconds, 0 disables)
+start_lead_cache_compactor(app, int(os.getenv('LEAD_CACHE_COMPACT_INTERVAL', '21600')))
+
+
+@app.cli.command('compact-lead-cache')
+@click.option('--batch-size', default=500, show_default=True, help='Rows deleted per transaction')
+def compact_lead_cache(batch_size):
+    """Delete expired lead cache rows: flask --app app_saas compact-lead-cache"""
+    removed = LeadCache.purge_expired(batch_size=batch_size)
+    print(f"🧹 Removed {removed} expired lead cache rows")
+    removed = LLMResponseCache.purge_expired(batch_size=batch_size)
+    removed += LLMResponseCache.trim(llm_cache.max_rows, batch_size=batch_size) if llm_cache.max_rows > 0 else 0
+    print(f"🧹 Removed {removed} expired or excess LLM response cache rows")
+
 
 @app.route('/')
 def landing():
@@ -155,39 +186,6 @@ def _split_subject_body(text: str, default_subject: str) -> dict:
     return {"subject": subject, "body": body}
 
 
-def _personalize_text(text: str, lead: Lead) -> str:
-    if not text:
-        return text
-    replacements = {
-        "{first_name}": lead.first_name or "there",
-        "{last_name}": lead.last_name or "",
-        "{full_name}": lead.full_name,
-        "{company}": lead.company or "",
-        "{role}": lead.role or "",
-        "{{first_name}}": lead.first_name or "there",
-        "{{last_name}}": lead.last_name or "",
-        "{{full_name}}": lead.full_name,
-        "{{company}}": lead.company or "",
-        "{{role}}": lead.role or "",
-    }
-    output = text
-    for token, value in replacements.items():
-        output = output.replace(token, value)
-    return output
-
-
-def _ensure_greeting(body: str, lead: Lead) -> str:
-    if not body:
-        return body
-    lines = body.splitlines()
-    first_line = lines[0].strip() if lines else ""
-    greeting = f"Hi {lead.first_name or 'there'},"
-    if first_line.lower().startswith(("hi ", "hello", "hey")):
-        lines[0] = greeting
-        return "\n".join(lines)
-    return "\n".join([greeting, ""] + lines)
-
-
 @app.route('/cold-email', methods=['GET', 'POST'])
 @login_required
 def cold_email():
@@ -233,8 +231,7 @@ def cold_email():
             if openai_key:
                 try:
                     config = load_config('config.yaml')
-                    from openai import OpenAI
-                    client = OpenAI(api_key=openai_key)
+                    client = openai_clients.get(openai_key)
                     if mode == 'job':
                         system_prompt = (
                             "You are a job-seeker cold email expert. Write concise, polished outreach emails "
@@ -274,16 +271,21 @@ def cold_email():
                             f"Tone: {form_data['tone']}\n\n"
                             "Return output as:\nSubject: <subject line>\n<email body>"
                         )
-                    response = client.chat.completions.create(
-                        model=config.openai_model,
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt},
-                        ],
-                        temperature=0.6,
-                        max_tokens=500,
-                    )
-                    text = response.choices[0].message.content.strip()
+                    messages = [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ]
+                    cache_key = response_cache_key(config.openai_model, messages, temperature=0.6, max_tokens=500)
+                    text = None if request.form.get('force_regenerate') == 'on' else llm_cache.get(cache_key)
+                    if not text:
+                        response = client.chat.completions.create(
+                            model=config.openai_model,
+                            messages=messages,
+                            temperature=0.6,
+                            max_tokens=500,
+                        )
+                        text = response.choices[0].message.content.strip()
+                        llm_cache.set(cache_key, config.openai_model, text)
                     output = _split_subject_body(text, default_subject)
                     used_openai = True
                 except Exception:
@@ -358,8 +360,7 @@ def cold_email_campaign():
                 if openai_key:
                     try:
                         config = load_config('config.yaml')
-                        from openai import OpenAI
-                        client = OpenAI(api_key=openai_key)
+                        client = openai_clients.get(openai_key)
                         if mode == 'job':
                             system_prompt = (
                                 "You are a job-seeker cold email expert. Write concise, polished outreach emails "
@@ -473,20 +474,13 @@ def cold_email_campaign():
                     flash(f"No leads found for {company.domain} using providers: {provider_list}.", "warning")
                 else:
                     leads_filtered = filter_leads(leads_raw, config.target_roles, config.excluded_roles, config.min_email_confidence)
-                    leads_ranked = rank_leads(leads_filtered)
+                    leads_ranked = rank_leads(leads_filtered, seniority=config.seniority_for(domain_type))
 
                     if not leads_ranked:
                         flash(f"No leads matched target roles for {domain_type}", "error")
                     else:
-                        base_subject = campaign_email['subject']
-                        base_body = campaign_email['body']
-                        drafts = []
-                        for ranked in leads_ranked:
-                            lead = ranked.lead
-                            subject = _personalize_text(base_subject, lead)
-                            body = _personalize_text(base_body, lead)
-                            body = _ensure_greeting(body, lead)
-                            drafts.append(EmailDraft(subject=subject, body=body))
+                        base_draft = EmailDraft(subject=campaign_email['subject'], body=campaign_email['body'])
+                        drafts = [personalize_draft(base_draft, ranked.lead) for ranked in leads_ranked]
 
                         write_markdown('send_sheet.md', leads_ranked, drafts)
                         write_csv('send_sheet.csv', leads_ranked, drafts)
@@ -560,6 +554,7 @@ def generate():
         portfolio_url = request.form.get('portfolio_url', '').strip()
         resume_url = request.form.get('resume_url', '').strip()
         custom_subject = request.form.get('custom_subject', '').strip()
+        force_regenerate = request.form.get('force_regenerate') == 'on'
         
         if not domain:
             flash('Domain is required', 'error')
@@ -587,8 +582,8 @@ def generate():
             # Try to get OpenAI key from environment variable, then user settings
             openai_key = os.getenv('OPENAI_API_KEY') or current_user.get_api_key('openai')
             if openai_key:
-                os.environ['OPENAI_API_KEY'] = openai_key
-                openai_client = OpenAIDraftClient(openai_key, OpenAIDraftConfig(model=config.openai_model))
+                openai_client = OpenAIDraftClient(openai_key, OpenAIDraftConfig.from_agent_config(config),
+                                                 cache=llm_cache, refresh=force_regenerate)
             else:
                 config.use_openai_drafts = False
                 flash('💡 OpenAI API key not configured. Add it in Settings to enable AI-generated drafts.', 'info')
@@ -610,7 +605,7 @@ def generate():
             return redirect(url_for('index'))
         
         leads_filtered = filter_leads(leads_raw, config.target_roles, config.excluded_roles, config.min_email_confidence)
-        leads_ranked = rank_leads(leads_filtered)
+        leads_ranked = rank_leads(leads_filtered, seniority=config.seniority_for(domain_type))
         
         if not leads_ranked:
             flash(f"No leads matched target roles for {domain_type}", "error")
@@ -628,6 +623,9 @@ def generate():
                 openai_client=openai_client,
                 custom_subject=custom_subject if custom_subject else None,
                 resume_url=resume_url if resume_url else None,
+                max_workers=config.draft_workers,
+                reuse=config.draft_reuse,
+                seniority=config.seniority_for(domain_type),
             )
         except RuntimeError as e:
             if 'OPENAI_API_KEY' in str(e):
@@ -748,13 +746,16 @@ def download(filename):
 @login_required
 def batch():
     if request.method == 'POST':
-        companies_text = request.form.get('companies', '').strip()
+        companies_text = (request.form.get('companies') or request.form.get('companies_text') or '').strip()
         if not companies_text:
             flash('Please enter at least one company domain', 'error')
             return render_template('batch.html', user=current_user)
         
         domains = [d.strip() for d in companies_text.split('\n') if d.strip()]
         domain_type = request.form.get('domain_type', 'product_management').strip()
+        custom_subject = request.form.get('custom_subject', '').strip()
+        force_regenerate = request.form.get('force_regenerate') == 'on'
+        resume_url = request.form.get('resume_url', '').strip()
         config = load_config('config.yaml')
         
         if config.domains and domain_type in config.domains:
@@ -763,14 +764,22 @@ def batch():
             if 'background' in domain_config:
                 config.candidate_background_summary = domain_config['background']
         
+        # Plan provider spend first: cached domains are free, the rest go where leads are likeliest
+        user = current_user._get_current_object()
+        companies = [CompanyInput(name=domain, domain=normalize_domain(domain)) for domain in domains]
+        plan = email_finder.plan_batch([company.domain for company in companies], user)
+        if request.form.get('action') == 'plan':
+            return render_template('batch.html', user=current_user, plan=plan, companies_text=companies_text)
+        planned_providers = plan.provider_map()
+        
         # Use multi-provider finder for batch processing
         openai_client = None
         if config.use_openai_drafts:
             # Try to get OpenAI key from environment variable, then user settings
             openai_key = os.getenv('OPENAI_API_KEY') or current_user.get_api_key('openai')
             if openai_key:
-                os.environ['OPENAI_API_KEY'] = openai_key
-                openai_client = OpenAIDraftClient(openai_key, OpenAIDraftConfig(model=config.openai_model))
+                openai_client = OpenAIDraftClient(openai_key, OpenAIDraftConfig.from_agent_config(config),
+                                                 cache=llm_cache, refresh=force_regenerate)
             else:
                 config.use_openai_drafts = False
                 flash('💡 OpenAI API key not configured. Add it in Settings to enable AI-generated drafts.', 'info')
@@ -779,21 +788,28 @@ def batch():
         all_ranked = []
         all_leads = 0
         
-        for domain in domains:
+        # Search domains concurrently; results come back in submission order
+        def fetch(company):
+            with app.app_context():
+                return email_finder.find_leads(company.domain, domain_type, user,
+                                              preferred_provider=planned_providers.get(company.domain))
+        
+        for result in discover_leads(companies, fetch, max_workers=config.discovery_workers):
+            domain = result.company.name
             try:
-                company = CompanyInput(name=domain, domain=normalize_domain(domain))
-                # Use multi-provider finder with caching
-                leads_raw = email_finder.find_leads(company.domain, domain_type, current_user)
+                if result.error is not None:
+                    raise result.error
+                leads_raw = result.leads
                 
                 if leads_raw:
                     leads_filtered = filter_leads(leads_raw, config.target_roles, config.excluded_roles, config.min_email_confidence)
-                    leads_ranked = rank_leads(leads_filtered)
+                    leads_ranked = rank_leads(leads_filtered, seniority=config.seniority_for(domain_type))
                     
                     if leads_ranked:
                         # Extract Lead objects from RankedLead
                         ordered_leads = [item.lead for item in leads_ranked]
                         try:
-                            drafts = generate_emails(ordered_leads, config.portfolio_url, config.candidate_background_summary, config.tone, openai_client=openai_client, custom_subject=custom_subject if custom_subject else None, resume_url=resume_url if resume_url else None)
+                            drafts = generate_emails(ordered_leads, config.portfolio_url, config.candidate_background_summary, config.tone, openai_client=openai_client, custom_subject=custom_subject if custom_subject else None, resume_url=resume_url if resume_url else None, max_workers=config.draft_workers, reuse=config.draft_reuse, seniority=config.seniority_for(domain_type))
                         except RuntimeError as e:
                             if 'OPENAI_API_KEY' in str(e):
                                 flash('💡 OpenAI API key not configured. Using template-based emails instead.', 'info')
@@ -820,6 +836,12 @@ def batch():
         current_user.increment_usage(all_leads)
         db.session.commit()
         
+        if openai_client:
+            usage = openai_client.usage()
+            print(f"✉️ Batch drafts: {usage['drafts']} AI, {usage['fallbacks']} template fallbacks, "
+                  f"{usage['calls']} OpenAI calls ({usage['calls_saved']} saved by single-call drafts, ~{usage['tokens_saved']} tokens, "
+                  f"{usage['cache_hits']} answered from cache), {usage['total_tokens']} tokens")
+        
         if all_drafts:
             write_markdown('send_sheet.md', all_ranked, all_drafts)
             write_csv('send_sheet.csv', all_ranked, all_drafts)
@@ -844,30 +866,27 @@ def dashboard():
     # Build a small lead preview list from cached results
     leads_preview = []
     seen_emails = set()
+    config = load_config('config.yaml')
     for search in recent_searches:
-        cache = LeadCache.query.filter_by(
-            domain=search.domain,
-            domain_type=search.domain_type
-        ).order_by(LeadCache.created_at.desc()).first()
-
-        if not cache or not cache.leads_data:
-            continue
-
-        try:
-            cached_leads = json.loads(cache.leads_data)
-        except (TypeError, json.JSONDecodeError):
+        # Served from the finder's in-memory tier when warm, so no SQL/JSON per search
+        cached_leads = email_finder.get_cached_leads(search.domain)
+        if not cached_leads:
             continue
+        # The cache holds the raw provider response; apply this search's profile on read
+        profile = (config.domains or {}).get(search.domain_type)
+        if profile:
+            cached_leads = filter_leads(cached_leads, profile['target_roles'], config.excluded_roles, 0)
 
         for lead in cached_leads:
-            email = lead.get('email')
+            email = lead.email
             if email and email in seen_emails:
                 continue
             leads_preview.append({
-                'name': lead.get('full_name') or " ".join(filter(None, [lead.get('first_name'), lead.get('last_name')])).strip(),
-                'role': lead.get('role'),
+                'name': " ".join(filter(None, [lead.first_name, lead.last_name])).strip(),
+                'role': lead.role,
                 'email': email,
-                'company': lead.get('company') or search.company_name or search.domain,
-                'confidence': lead.get('confidence'),
+                'company': lead.company or search.company_name or search.domain,
+                'confidence': lead.confidence,
                 'source_domain': search.domain
             })
             if email:
@@ -906,6 +925,13 @@ def provider_status():
     return jsonify(status)
 
 
+@app.route('/api/finder-stats')
+@login_required
+def finder_stats():
+    """In-process lead finder statistics (cache hit/miss counters) for this worker"""
+    return jsonify(email_finder.get_stats())
+
+
 @app.route('/settings')
 @login_required
 def settings():
@@ -1030,7 +1056,7 @@ def delete_template(template_id):
 @login_required
 def analytics():
     """Analytics dashboard showing usage stats"""
-    from database import Search, APICallLog
+    from database import Search, APICallDailyRollup
     from datetime import datetime, timedelta
     from sqlalchemy import func
     
@@ -1057,14 +1083,8 @@ def analytics():
         Search.created_at >= month_ago
     ).group_by(func.date(Search.created_at)).all()
     
-    # API calls by provider
-    api_calls_by_provider = db.session.query(
-        APICallLog.provider,
-        func.count(APICallLog.id).label('calls'),
-        func.sum(APICallLog.credits_used).label('credits')
-    ).filter(
-        APICallLog.user_id == current_user.id
-    ).group_by(APICallLog.provider).all()
+    # API calls by provider (from the daily rollup, not the raw call log)
+    api_calls_by_provider = APICallDailyRollup.usage_by_provider(current_user.id)
     
     # Success rate
     successful_searches = Search.query.filter_by(user_id=current_user.id, success=True).count()
@@ -1166,7 +1186,7 @@ def export_searches():
 @login_required
 def export_analytics():
     """Export analytics data as CSV"""
-    from database import Search, APICallLog
+    from database import Search, APICallDailyRollup
     import csv
     from io import StringIO
     from datetime import datetime, timedelta
@@ -1193,13 +1213,7 @@ def export_analytics():
     writer.writerow(['API Usage by Provider'])
     writer.writerow(['Provider', 'Total Calls', 'Credits Used'])
     
-    api_calls = db.session.query(
-        APICallLog.provider,
-        func.count(APICallLog.id).label('calls'),
-        func.sum(APICallLog.credits_used).label('credits')
-    ).filter(
-        APICallLog.user_id == current_user.id
-    ).group_by(APICallLog.provider).all()
+    api_calls = APICallDailyRollup.usage_by_provider(current_user.id)
     
     for provider in api_calls:
         writer.writerow([provider.provider, provider.calls, provider.credits or 0])
@@ -0,0 +1,176 @@
+import argparse
+import random
+import time
+import tracemalloc
+from typing import Callable, List
+
+from pm_outreach_agent.lead_filter import (
+    SENIORITY_ORDER,
+    dedupe_lead_batch,
+    filter_lead_batch,
+    filter_leads,
+    iter_filtered_leads,
+    rank_lead_batch,
+    rank_leads,
+    rank_top_leads,
+)
+from pm_outreach_agent.models import LEAD_FIELDS, Lead, LeadBatch, RankedLead
+from pm_outreach_agent.vectorized import HAS_NUMPY, rank_batch_indices
+from pm_outreach_agent.utils import contains_role, load_config, normalize_role
+from run_agent import dedupe_leads
+
+
+ROLE_WORDS = [
+    "Founder", "Co-founder", "CEO", "Chief Product Officer", "Head of Product", "VP Product",
+    "Director of Product", "Group Product Manager", "Senior Product Manager", "Product Manager",
+    "Technical Recruiter", "HR Business Partner", "Talent Acquisition", "Marketing Manager",
+    "Sales Director", "Software Engineer", "Staff Engineer", "Designer", "Data Scientist", "",
+]
+QUALIFIERS = ["", "Senior ", "Lead ", "Associate ", "Interim "]
+SUFFIXES = ["", ", Growth", " - Platform", " (EMEA)", " & Strategy"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Micro-benchmark for lead filtering and ranking")
+    parser.add_argument("--config", type=str, default="config.yaml", help="Path to config.yaml")
+    parser.add_argument("--leads", type=int, default=100_000, help="Number of synthetic leads")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per variant (best is reported)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--top-k", type=int, default=50, help="K for the streaming top-K ranker")
+    return parser.parse_args()
+
+
+def synthetic_leads(count: int, seed: int) -> List[Lead]:
+    rng = random.Random(seed)
+    leads: List[Lead] = []
+    for idx in range(count):
+        role = f"{rng.choice(QUALIFIERS)}{rng.choice(ROLE_WORDS)}{rng.choice(SUFFIXES)}".strip()
+        leads.append(Lead(
+            first_name=f"First{idx}",
+            last_name=f"Last{idx}",
+            role=role,
+            email=f"person{idx}@example{idx % 500}.com",
+            confidence=rng.randint(0, 100),
+            company=f"Example {idx % 500}",
+        ))
+    return leads
+
+
+# Pre-matcher implementations, kept here as the baseline and as a correctness oracle.
+def legacy_role_priority(role: str) -> int:
+    normalized = normalize_role(role)
+    for idx, key in enumerate(SENIORITY_ORDER):
+        if key in normalized:
+            return len(SENIORITY_ORDER) - idx
+    return 0
+
+
+def legacy_filter_leads(leads: List[Lead], target_roles: List[str], excluded_roles: List[str], min_confidence: int) -> List[Lead]:
+    filtered: List[Lead] = []
+    for lead in leads:
+        if lead.confidence < min_confidence:
+            continue
+        if excluded_roles and contains_role(excluded_roles, lead.role):
+            continue
+        if target_roles and not contains_role(target_roles, lead.role):
+            continue
+        filtered.append(lead)
+    return filtered
+
+
+def legacy_rank_leads(leads: List[Lead]) -> List[RankedLead]:
+    ranked = [RankedLead(lead=lead, score=legacy_role_priority(lead.role) * 100 + lead.confidence) for lead in leads]
+    ranked.sort(key=lambda item: item.score, reverse=True)
+    return ranked
+
+
+def best_of(repeat: int, fn: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def report(label: str, seconds: float, count: int, baseline: float = None) -> None:
+    speedup = f"  {baseline / seconds:5.1f}x" if baseline else ""
+    print(f"{label:<28} {seconds * 1000:9.1f} ms  {count / seconds:12,.0f} leads/s{speedup}")
+
+
+def allocated_kib(build: Callable[[], object]) -> float:
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size / 1024
+
+
+def main() -> None:
+    args = parse_args()
+    config = load_config(args.config)
+    leads = synthetic_leads(args.leads, args.seed)
+    target, excluded, minimum = config.target_roles, config.excluded_roles, config.min_email_confidence
+
+    expected = legacy_rank_leads(legacy_filter_leads(leads, target, excluded, minimum))
+    actual = rank_leads(filter_leads(leads, target, excluded, minimum))
+    if [(item.lead.email, item.score) for item in expected] != [(item.lead.email, item.score) for item in actual]:
+        raise SystemExit("Matcher results differ from the legacy implementation")
+
+    print(f"{len(leads):,} synthetic leads, {len(target)} target / {len(excluded)} excluded roles, "
+          f"{len(expected):,} kept\n")
+    legacy_filter = best_of(args.repeat, lambda: legacy_filter_leads(leads, target, excluded, minimum))
+    report("filter (legacy)", legacy_filter, len(leads))
+    report("filter (role matcher)", best_of(args.repeat, lambda: filter_leads(leads, target, excluded, minimum)),
+           len(leads), legacy_filter)
+
+    kept = filter_leads(leads, target, excluded, minimum)
+    legacy_rank = best_of(args.repeat, lambda: legacy_rank_leads(kept))
+    report("rank (legacy)", legacy_rank, len(kept))
+    report("rank (role matcher)", best_of(args.repeat, lambda: rank_leads(kept)), len(kept), legacy_rank)
+
+    top = rank_top_leads(iter_filtered_leads(leads, target, excluded, minimum), args.top_k)
+    if [(item.lead.email, item.score) for item in top] != [(item.lead.email, item.score) for item in actual[:args.top_k]]:
+        raise SystemExit("Top-K ranking differs from the full ranking")
+    full_pipeline = best_of(args.repeat, lambda: rank_leads(filter_leads(leads, target, excluded, minimum))[:args.top_k])
+    report("filter+rank, full sort", full_pipeline, len(leads))
+    report(f"filter+rank, top-{args.top_k} heap",
+           best_of(args.repeat, lambda: rank_top_leads(iter_filtered_leads(leads, target, excluded, minimum), args.top_k)),
+           len(leads), full_pipeline)
+
+    batch = LeadBatch.from_leads(leads)
+    batch_ranked = rank_lead_batch(filter_lead_batch(dedupe_lead_batch(batch), target, excluded, minimum))
+    if [(item.lead.email, item.score) for item in batch_ranked] != [(item.lead.email, item.score) for item in actual]:
+        raise SystemExit("Columnar ranking differs from the object pipeline")
+    objects = best_of(args.repeat, lambda: rank_leads(filter_leads(dedupe_leads(leads), target, excluded, minimum)))
+    report("dedupe+filter+rank, objects", objects, len(leads))
+    report("dedupe+filter+rank, batch", best_of(args.repeat, lambda: rank_lead_batch(
+        filter_lead_batch(dedupe_lead_batch(batch), target, excluded, minimum))), len(leads), objects)
+    report(f"  same, batch top-{args.top_k}", best_of(args.repeat, lambda: rank_lead_batch(
+        filter_lead_batch(dedupe_lead_batch(batch), target, excluded, minimum), k=args.top_k)), len(leads), objects)
+
+    expected_emails = [item.lead.email for item in actual]
+    python_indices = best_of(args.repeat, lambda: rank_batch_indices(batch, target, excluded, minimum, use_numpy=False))
+    if [batch.emails[i] for i in rank_batch_indices(batch, target, excluded, minimum, use_numpy=False)] != expected_emails:
+        raise SystemExit("Pure-Python ranked indices differ from rank_leads")
+    report("ranked indices, Python", python_indices, len(leads), full_pipeline)
+    if HAS_NUMPY:
+        if [batch.emails[i] for i in rank_batch_indices(batch, target, excluded, minimum, use_numpy=True)] != expected_emails:
+            raise SystemExit("NumPy ranked indices differ from rank_leads")
+        report("ranked indices, NumPy", best_of(args.repeat, lambda: rank_batch_indices(
+            batch, target, excluded, minimum, use_numpy=True)), len(leads), python_indices)
+        report(f"  same, NumPy top-{args.top_k}", best_of(args.repeat, lambda: rank_batch_indices(
+            batch, target, excluded, minimum, k=args.top_k, use_numpy=True)), len(leads), python_indices)
+    else:
+        print("ranked indices, NumPy        skipped (numpy not installed)")
+
+    records = [{name: getattr(lead, name) for name in LEAD_FIELDS} for lead in leads]
+    objects_kib = allocated_kib(lambda: [Lead(**record) for record in records])
+    columns_kib = allocated_kib(lambda: LeadBatch.from_records(records))
+    print(f"\nload {len(records):,} cached records: Lead objects {objects_kib:,.0f} KiB, "
+          f"LeadBatch {columns_kib:,.0f} KiB (field strings shared by both)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import json
+import tempfile
+from typing import Dict, List, Optional
+
+from pm_outreach_agent.batch_drafts import LocalBatchBackend, run_batch_drafts
+from pm_outreach_agent.email_generator import generate_email
+from pm_outreach_agent.models import Lead
+
+
+MODEL = "gpt-4o-mini"
+PORTFOLIO_URL = "https://example.com/portfolio"
+BACKGROUND = "I'm Alex Doe, a product manager with five years of B2B SaaS experience."
+TONE = "warm"
+
+
+def sample_leads() -> List[Lead]:
+    return [
+        Lead(first_name=f"First{idx}", last_name=f"Last{idx}", role="Head of Product",
+             email=f"person{idx}@example.com", confidence=90, company=f"Example {idx}")
+        for idx in range(4)
+    ]
+
+
+def responder(body: Dict[str, object]) -> Optional[str]:
+    """Answers the batch requests the way the model might, by the lead named in the prompt"""
+    prompt = json.dumps(body["messages"])
+    if "First0" in prompt:
+        return json.dumps({"subject": "Product at Example 0", "body": "Hi First0,\n\nJSON draft."})
+    if "First1" in prompt:
+        return "Subject: Product at Example 1\n\nHi First1,\n\nPlain-text draft."
+    if "First3" in prompt:
+        return "{}"
+    return None
+
+
+class PendingBackend(LocalBatchBackend):
+    """Local backend whose jobs never finish on their own, to exercise the max_wait cancel"""
+
+    def __init__(self, directory: str) -> None:
+        super().__init__(directory, responder)
+        self.cancelled: List[str] = []
+
+    def status(self, job_id: str) -> str:
+        return "cancelled" if job_id in self.cancelled else "in_progress"
+
+    def cancel(self, job_id: str) -> str:
+        self.cancelled.append(job_id)
+        return "cancelling"
+
+
+def template(lead: Lead, custom_subject: Optional[str] = None):
+    return generate_email(lead, PORTFOLIO_URL, BACKGROUND, TONE, custom_subject)
+
+
+def main() -> None:
+    leads = sample_leads()
+    with tempfile.TemporaryDirectory() as job_dir:
+        result = run_batch_drafts(leads, LocalBatchBackend(job_dir, responder), MODEL, PORTFOLIO_URL,
+                                  BACKGROUND, TONE, job_dir=job_dir, log=lambda message: None)
+        if (result.status, result.generated, result.fallbacks) != ("completed", 2, 2):
+            raise SystemExit(f"Unexpected batch outcome: {result}")
+        if [draft.subject for draft in result.drafts[:2]] != ["Product at Example 0", "Product at Example 1"]:
+            raise SystemExit("Batch output was not merged back in lead order")
+        if "JSON draft." not in result.drafts[0].body or "Plain-text draft." not in result.drafts[1].body:
+            raise SystemExit("Batch output bodies were not kept")
+        # Lead 2 failed in the batch and lead 3 came back without a body
+        for lead, draft in zip(leads[2:], result.drafts[2:]):
+            if draft != template(lead):
+                raise SystemExit(f"Lead {lead.email} did not fall back to the template draft")
+
+        result = run_batch_drafts(leads, LocalBatchBackend(job_dir, responder), MODEL, PORTFOLIO_URL,
+                                  BACKGROUND, TONE, job_dir=job_dir, custom_subject="Hello",
+                                  log=lambda message: None)
+        if [draft.subject for draft in result.drafts] != ["Hello"] * len(leads):
+            raise SystemExit("Custom subject was not applied to every draft")
+
+        backend = PendingBackend(job_dir)
+        result = run_batch_drafts(leads, backend, MODEL, PORTFOLIO_URL, BACKGROUND, TONE, job_dir=job_dir,
+                                  poll_interval=0, max_wait=0, log=lambda message: None)
+        if backend.cancelled != [result.job_id] or result.status != "cancelling":
+            raise SystemExit("Job still running at max_wait was not cancelled")
+        if result.drafts != [template(lead) for lead in leads]:
+            raise SystemExit("Cancelled job did not fall back to template drafts")
+
+    print("Batch drafts: output merge, template fallback and max_wait cancel OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 # Database models for SaaS multi-tenant system
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy import func, inspect
+from sqlalchemy.exc import OperationalError, ProgrammingError
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta
 from cryptography.fernet import Fernet
@@ -8,6 +10,14 @@ import base64
 import hashlib
 import secrets
 import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no file locks, the DDL guards below still apply
+    fcntl = None
 
 db = SQLAlchemy()
 
@@ -276,9 +286,64 @@ class Search(db.Model):
         return f'<Search {self.domain} - {self.lead_count} leads>'
 
 
-class LeadCache(db.Model):
-    """Cache API results to avoid duplicate calls"""
+def _dialect_insert():
+    """The engine dialect's ``insert`` with ON CONFLICT support, or None where there is none"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    return None
+
+
+def _upsert(model, values: dict, keys: tuple):
+    """Insert a row or overwrite the one with the same unique ``keys``; the caller commits"""
+    insert = _dialect_insert()
+    if insert is not None:
+        stmt = insert(model.__table__).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={key: stmt.excluded[key] for key in values if key not in keys},
+        )
+        db.session.execute(stmt)
+    else:
+        row = model.query.filter_by(**{key: values[key] for key in keys}).first()
+        if row is None:
+            db.session.add(model(**values))
+        else:
+            for key, value in values.items():
+                setattr(row, key, value)
+
+
+class ExpiringCacheMixin:
+    """Batched deletion of rows whose ``expires_at`` has passed"""
+    
+    @classmethod
+    def purge_expired(cls, batch_size: int = 500) -> int:
+        """Delete expired rows in batches so the table stays small; returns rows removed"""
+        removed = 0
+        while True:
+            ids = [row.id for row in db.session.query(cls.id).filter(
+                cls.expires_at <= datetime.utcnow()
+            ).limit(batch_size).all()]
+            if not ids:
+                break
+            cls.query.filter(cls.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+            removed += len(ids)
+            if len(ids) < batch_size:
+                break
+        return removed
+
+
+class LeadCache(ExpiringCacheMixin, db.Model):
+    """Cache API results to avoid duplicate calls (one row per domain/domain_type)"""
     __tablename__ = 'lead_cache'
+    __table_args__ = (
+        db.Index('uq_lead_cache_domain_domain_type', 'domain', 'domain_type', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     domain = db.Column(db.String(100), nullable=False, index=True)
@@ -299,13 +364,129 @@ class LeadCache(db.Model):
         """Check if cache is still valid"""
         return self.expires_at > datetime.utcnow()
     
+    @classmethod
+    def upsert(cls, domain: str, domain_type: str, leads_data: str, lead_count: int,
+               provider: str, expires_at: datetime):
+        """Insert or refresh the single cache row for (domain, domain_type)"""
+        values = {
+            'domain': domain,
+            'domain_type': domain_type,
+            'leads_data': leads_data,
+            'lead_count': lead_count,
+            'provider': provider,
+            'created_at': datetime.utcnow(),
+            'expires_at': expires_at,
+        }
+        _upsert(cls, values, ('domain', 'domain_type'))
+        db.session.commit()
+    
+    @classmethod
+    def remove_duplicates(cls) -> int:
+        """Keep only the newest row per (domain, domain_type); older releases inserted one per search"""
+        newest = db.session.query(func.max(cls.id)).group_by(cls.domain, cls.domain_type)
+        removed = cls.query.filter(~cls.id.in_(newest)).delete(synchronize_session=False)
+        db.session.commit()
+        return removed
+    
     def __repr__(self):
         return f'<LeadCache {self.domain} - {self.lead_count} leads>'
 
 
+class LLMResponseCache(ExpiringCacheMixin, db.Model):
+    """OpenAI completions keyed by a hash of model, prompt and sampling options"""
+    __tablename__ = 'llm_response_cache'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    cache_key = db.Column(db.String(64), nullable=False, unique=True)  # sha256 hex
+    model = db.Column(db.String(100))
+    response = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    expires_at = db.Column(db.DateTime, index=True)
+    
+    @classmethod
+    def lookup(cls, cache_key: str):
+        """Stored response text for this key, or None when missing or expired"""
+        row = db.session.query(cls.response).filter(
+            cls.cache_key == cache_key, cls.expires_at > datetime.utcnow()
+        ).first()
+        return row.response if row else None
+    
+    @classmethod
+    def store(cls, cache_key: str, model: str, response: str, expires_at: datetime):
+        _upsert(cls, {
+            'cache_key': cache_key,
+            'model': model,
+            'response': response,
+            'created_at': datetime.utcnow(),
+            'expires_at': expires_at,
+        }, ('cache_key',))
+        db.session.commit()
+    
+    @classmethod
+    def trim(cls, max_rows: int, batch_size: int = 500) -> int:
+        """Delete the oldest rows beyond ``max_rows``; returns rows removed"""
+        removed = 0
+        excess = db.session.query(func.count(cls.id)).scalar() - max_rows
+        while excess > 0:
+            ids = [row.id for row in db.session.query(cls.id).order_by(cls.created_at, cls.id)
+                   .limit(min(excess, batch_size)).all()]
+            if not ids:
+                break
+            cls.query.filter(cls.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+            removed += len(ids)
+            excess -= len(ids)
+        return removed
+    
+    def __repr__(self):
+        return f'<LLMResponseCache {self.cache_key[:12]} {self.model}>'
+
+
+class LLMResponseStore:
+    """Thread-safe get/set access to LLMResponseCache for OpenAIDraftClient and the cold email generator.
+    
+    Each call runs in its own app context, so it works from draft worker threads
+    as well as request handlers. A ``ttl_seconds`` of 0 disables the cache; the
+    table is trimmed back to ``max_rows`` every ``trim_every`` writes.
+    """
+    
+    def __init__(self, app, ttl_seconds: int, max_rows: int, trim_every: int = 100):
+        self.app = app
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self.trim_every = max(1, trim_every)
+        self._writes = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+    
+    def get(self, key: str):
+        if not self.enabled:
+            return None
+        with self.app.app_context():
+            return LLMResponseCache.lookup(key)
+    
+    def set(self, key: str, model: str, response: str):
+        if not self.enabled:
+            return
+        with self.app.app_context():
+            LLMResponseCache.store(key, model, response, datetime.utcnow() + timedelta(seconds=self.ttl_seconds))
+            with self._lock:
+                self._writes += 1
+                due = self.max_rows > 0 and self._writes % self.trim_every == 0
+            if due:
+                LLMResponseCache.trim(self.max_rows)
+
+
 class APICallLog(db.Model):
     """Track API calls for rate limiting"""
     __tablename__ = 'api_call_logs'
+    __table_args__ = (
+        # Rate-limit lookups filter on all four columns
+        db.Index('ix_api_call_logs_user_provider_success_created', 'user_id', 'provider', 'success', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
@@ -315,6 +496,8 @@ class APICallLog(db.Model):
     # Call status
     success = db.Column(db.Boolean, default=True)
     credits_used = db.Column(db.Integer, default=1)
+    lead_count = db.Column(db.Integer)  # None when the call raised, 0 for an empty response
+    latency_ms = db.Column(db.Integer)
     
     # Timing
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
@@ -323,6 +506,105 @@ class APICallLog(db.Model):
         return f'<APICall {self.provider} - {self.domain}>'
 
 
+class APICallDailyRollup(db.Model):
+    """Per-day API usage totals per user and provider, maintained alongside APICallLog"""
+    __tablename__ = 'api_call_daily_rollups'
+    __table_args__ = (
+        db.Index('uq_api_call_daily_rollup_user_provider_day', 'user_id', 'provider', 'day', unique=True),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
+    provider = db.Column(db.String(50), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    
+    calls = db.Column(db.Integer, default=0, nullable=False)
+    successes = db.Column(db.Integer, default=0, nullable=False)
+    credits_used = db.Column(db.Integer, default=0, nullable=False)
+    leads = db.Column(db.Integer, default=0, nullable=False)
+    
+    @classmethod
+    def increment(cls, user_id: int, provider: str, day, calls: int = 1, successes: int = 0,
+                  credits_used: int = 0, leads: int = 0):
+        """Add to the day's counters; runs in the caller's transaction (no commit)"""
+        values = {
+            'user_id': user_id,
+            'provider': provider,
+            'day': day,
+            'calls': calls,
+            'successes': successes,
+            'credits_used': credits_used,
+            'leads': leads,
+        }
+        counters = ('calls', 'successes', 'credits_used', 'leads')
+        insert = _dialect_insert()
+        if insert is not None:
+            stmt = insert(cls.__table__).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['user_id', 'provider', 'day'],
+                set_={key: cls.__table__.c[key] + stmt.excluded[key] for key in counters},
+            )
+            db.session.execute(stmt)
+        else:
+            rollup = cls.query.filter_by(user_id=user_id, provider=provider, day=day).with_for_update().first()
+            if rollup is None:
+                db.session.add(cls(**values))
+            else:
+                for key in counters:
+                    setattr(rollup, key, getattr(rollup, key) + values[key])
+    
+    @classmethod
+    def usage_by_provider(cls, user_id: int):
+        """Rows of (provider, calls, credits) across all days for a user"""
+        return db.session.query(
+            cls.provider,
+            func.sum(cls.calls).label('calls'),
+            func.sum(cls.credits_used).label('credits')
+        ).filter(
+            cls.user_id == user_id
+        ).group_by(cls.provider).all()
+    
+    @classmethod
+    def backfill(cls) -> int:
+        """Build rollups from existing APICallLog rows when the table is new; returns rows written
+        
+        On SQLite and Postgres this is one INSERT ... SELECT that skips days already
+        present, so a second process running it at the same time adds nothing.
+        """
+        if db.session.query(cls.id).first() is not None:
+            return 0
+        day = func.date(APICallLog.created_at)
+        query = db.session.query(
+            APICallLog.user_id,
+            APICallLog.provider,
+            day.label('day'),
+            func.count(APICallLog.id).label('calls'),
+            func.sum(db.case((APICallLog.success == True, 1), else_=0)).label('successes'),
+            func.sum(func.coalesce(APICallLog.credits_used, 0)).label('credits_used'),
+            func.sum(func.coalesce(APICallLog.lead_count, 0)).label('leads')
+        ).group_by(APICallLog.user_id, APICallLog.provider, day)
+        insert = _dialect_insert()
+        if insert is not None:
+            stmt = insert(cls.__table__).from_select(
+                ['user_id', 'provider', 'day', 'calls', 'successes', 'credits_used', 'leads'],
+                # SQLite needs a WHERE on INSERT ... SELECT for ON CONFLICT to parse
+                query.subquery().select().where(db.true())
+            ).on_conflict_do_nothing(index_elements=['user_id', 'provider', 'day'])
+            written = db.session.execute(stmt).rowcount
+            db.session.commit()
+            return max(written, 0)
+        rows = query.all()
+        for row in rows:
+            db.session.add(cls(user_id=row.user_id, provider=row.provider, day=row.day, calls=row.calls,
+                               successes=row.successes or 0, credits_used=row.credits_used or 0,
+                               leads=row.leads or 0))
+        db.session.commit()
+        return len(rows)
+    
+    def __repr__(self):
+        return f'<APICallDailyRollup {self.provider} {self.day} - {self.calls} calls>'
+
+
 class EmailTemplate(db.Model):
     """User-customizable email templates"""
     __tablename__ = 'email_templates'
@@ -356,10 +638,115 @@ class EmailTemplate(db.Model):
         return f'<EmailTemplate {self.name}>'
 
 
+# Arbitrary constant naming the Postgres advisory lock held while the schema is created/upgraded
+SCHEMA_LOCK_ID = 781_205_113
+
+
+@contextmanager
+def _schema_lock():
+    """Serialize schema creation and upgrade across processes (gunicorn starts several workers at once)"""
+    engine = db.engine
+    if engine.dialect.name == 'postgresql':
+        with engine.connect() as conn:
+            conn.exec_driver_sql(f'SELECT pg_advisory_lock({SCHEMA_LOCK_ID})')
+            try:
+                yield
+            finally:
+                conn.exec_driver_sql(f'SELECT pg_advisory_unlock({SCHEMA_LOCK_ID})')
+        return
+    path = engine.url.database if engine.dialect.name == 'sqlite' else None
+    if fcntl is None or not path or path == ':memory:':
+        yield
+        return
+    with open(f'{path}.schema.lock', 'a') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _run_ddl(statement, already_applied):
+    """Run one DDL step, tolerating a concurrent process that applied it first"""
+    try:
+        statement()
+    except (OperationalError, ProgrammingError):
+        if not already_applied():
+            raise
+
+
+def _add_column(table, column):
+    column_type = column.type.compile(dialect=db.engine.dialect)
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}')
+
+
+def _column_exists(table_name: str, column_name: str) -> bool:
+    return column_name in {column['name'] for column in inspect(db.engine).get_columns(table_name)}
+
+
+def _index_exists(table_name: str, index_name: str) -> bool:
+    return index_name in {index['name'] for index in inspect(db.engine).get_indexes(table_name)}
+
+
+def _upgrade_schema():
+    """Add columns and indexes introduced after a table was first created (create_all never alters tables)"""
+    inspector = inspect(db.engine)
+    for model in (LeadCache, APICallLog):
+        table = model.__table__
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns or not column.nullable:
+                continue
+            _run_ddl(lambda: _add_column(table, column), lambda: _column_exists(table.name, column.name))
+    
+    for model in (LeadCache, APICallLog):
+        existing = {index['name'] for index in inspector.get_indexes(model.__tablename__)}
+        for index in model.__table__.indexes:
+            if index.name in existing:
+                continue
+            if index.unique and model is LeadCache:
+                removed = LeadCache.remove_duplicates()
+                if removed:
+                    print(f"🧹 Removed {removed} duplicate lead cache rows")
+            _run_ddl(lambda: index.create(bind=db.engine, checkfirst=True),
+                     lambda: _index_exists(model.__tablename__, index.name))
+    
+    backfilled = APICallDailyRollup.backfill()
+    if backfilled:
+        print(f"📊 Backfilled {backfilled} daily API usage rollups")
+
+
+def start_lead_cache_compactor(app, interval_seconds: int, batch_size: int = 500):
+    """Periodically purge expired lead cache and LLM response cache rows in a daemon thread (0 disables)"""
+    if interval_seconds <= 0:
+        return None
+    
+    def run():
+        while True:
+            time.sleep(interval_seconds)
+            try:
+                with app.app_context():
+                    removed = LeadCache.purge_expired(batch_size=batch_size)
+                    removed_responses = LLMResponseCache.purge_expired(batch_size=batch_size)
+                if removed:
+                    print(f"🧹 Purged {removed} expired lead cache rows")
+                if removed_responses:
+                    print(f"🧹 Purged {removed_responses} expired LLM response cache rows")
+            except Exception as e:
+                print(f"❌ Lead cache compaction failed: {e}")
+    
+    thread = threading.Thread(target=run, name='lead-cache-compactor', daemon=True)
+    thread.start()
+    return thread
+
+
 def init_db(app):
     """Initialize database"""
     db.init_app(app)
     
     with app.app_context():
-        db.create_all()
+        with _schema_lock():
+            db.create_all()
+            _upgrade_schema()
         print("✅ Database initialized")
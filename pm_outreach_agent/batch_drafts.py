@@ -0,0 +1,209 @@
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .email_generator import generate_email
+from .models import EmailDraft, Lead
+from .openai_client import clean_draft_body, draft_from_combined, draft_messages, draft_options
+from .openai_pool import openai_clients
+
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def build_batch_requests(
+    leads: List[Lead],
+    model: str,
+    portfolio_url: str,
+    background_summary: str,
+    tone: str,
+    custom_subject: Optional[str] = None,
+    resume_url: Optional[str] = None,
+) -> List[Dict[str, object]]:
+    """One Batch API request line per lead, with the same prompt OpenAIDraftClient sends"""
+    single_call = not custom_subject
+    return [
+        {
+            "custom_id": f"lead-{index}",
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": model,
+                "messages": draft_messages(lead, portfolio_url, background_summary, tone, resume_url, single_call),
+                **draft_options(single_call),
+            },
+        }
+        for index, lead in enumerate(leads)
+    ]
+
+
+def read_batch_output(lines: Iterable[str]) -> Dict[str, str]:
+    """custom_id -> completion text for every request that succeeded in a Batch API output file"""
+    results: Dict[str, str] = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if item.get("error") or response.get("status_code") != 200:
+                continue
+            content = response["body"]["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            continue
+        if content and content.strip():
+            results[item["custom_id"]] = content.strip()
+    return results
+
+
+class OpenAIBatchBackend:
+    """Runs a JSONL job through the OpenAI Batch API (completes within 24 hours, at a lower price)"""
+
+    def __init__(self, api_key: str) -> None:
+        self._client = openai_clients.get(api_key)
+
+    def submit(self, path: str) -> str:
+        with open(path, "rb") as handle:
+            upload = self._client.files.create(file=handle, purpose="batch")
+        batch = self._client.batches.create(input_file_id=upload.id, endpoint=BATCH_ENDPOINT, completion_window="24h")
+        return batch.id
+
+    def status(self, job_id: str) -> str:
+        return self._client.batches.retrieve(job_id).status
+
+    def cancel(self, job_id: str) -> str:
+        return self._client.batches.cancel(job_id).status
+
+    def results(self, job_id: str) -> Dict[str, str]:
+        batch = self._client.batches.retrieve(job_id)
+        if not batch.output_file_id:
+            return {}
+        return read_batch_output(self._client.files.content(batch.output_file_id).text.splitlines())
+
+
+class LocalBatchBackend:
+    """File-based stand-in for the Batch API, for tests and offline runs.
+
+    Each request body is answered by ``respond(body)``; without a responder,
+    or when it returns None, the item is written as failed so the caller's
+    template fallback applies. Output uses the Batch API file format.
+    """
+
+    def __init__(self, directory: str, respond: Optional[Callable[[Dict[str, object]], Optional[str]]] = None) -> None:
+        self.directory = directory
+        self.respond = respond
+
+    def _output_path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}_output.jsonl")
+
+    def submit(self, path: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        job_id = f"local-{time.time_ns()}"
+        with open(path, "r", encoding="utf-8") as source, \
+                open(self._output_path(job_id), "w", encoding="utf-8") as output:
+            for line in source:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                content = self.respond(request["body"]) if self.respond else None
+                if content is None:
+                    item = {"custom_id": request["custom_id"], "response": None,
+                            "error": {"code": "no_response", "message": "No local response for this request"}}
+                else:
+                    item = {"custom_id": request["custom_id"], "error": None, "response": {
+                        "status_code": 200, "body": {"choices": [{"message": {"role": "assistant", "content": content}}]},
+                    }}
+                output.write(json.dumps(item) + "\n")
+        return job_id
+
+    def status(self, job_id: str) -> str:
+        return "completed" if os.path.exists(self._output_path(job_id)) else "failed"
+
+    def cancel(self, job_id: str) -> str:
+        # Local jobs finish during submit, so there is never anything left to stop
+        return self.status(job_id)
+
+    def results(self, job_id: str) -> Dict[str, str]:
+        with open(self._output_path(job_id), "r", encoding="utf-8") as handle:
+            return read_batch_output(handle)
+
+
+@dataclass
+class BatchDraftResult:
+    drafts: List[EmailDraft]
+    job_id: Optional[str]
+    status: str
+    generated: int = 0
+    fallbacks: int = 0
+
+
+def run_batch_drafts(
+    leads: List[Lead],
+    backend,
+    model: str,
+    portfolio_url: str,
+    background_summary: str,
+    tone: str,
+    job_dir: str = "batch_jobs",
+    custom_subject: Optional[str] = None,
+    resume_url: Optional[str] = None,
+    poll_interval: float = 30.0,
+    max_wait: float = 24 * 3600,
+    log: Callable[[str], None] = print,
+    sleep: Callable[[float], None] = time.sleep,
+) -> BatchDraftResult:
+    """Draft every lead through one batch job; drafts come back in lead order.
+
+    The job is written to ``job_dir`` as JSONL, submitted to ``backend`` and
+    polled until it finishes or ``max_wait`` seconds pass, after which it is
+    cancelled. Leads whose request failed, is missing or cannot be parsed get
+    the template draft.
+    """
+    if not leads:
+        return BatchDraftResult(drafts=[], job_id=None, status="empty")
+
+    os.makedirs(job_dir, exist_ok=True)
+    path = os.path.join(job_dir, f"drafts_{time.time_ns()}.jsonl")
+    requests = build_batch_requests(leads, model, portfolio_url, background_summary, tone, custom_subject, resume_url)
+    with open(path, "w", encoding="utf-8") as handle:
+        for request in requests:
+            handle.write(json.dumps(request, ensure_ascii=False) + "\n")
+
+    job_id = backend.submit(path)
+    log(f"Submitted batch job {job_id} with {len(requests)} draft requests ({path})")
+    deadline = time.monotonic() + max_wait
+    status = backend.status(job_id)
+    while status not in TERMINAL_STATUSES and time.monotonic() < deadline:
+        sleep(poll_interval)
+        status = backend.status(job_id)
+        log(f"Batch job {job_id}: {status}")
+    if status not in TERMINAL_STATUSES:
+        # Stop the job so it does not keep running, and billing, for drafts this run will not collect
+        status = backend.cancel(job_id)
+        log(f"Batch job {job_id} still unfinished after {max_wait:.0f}s; cancel requested ({status})")
+
+    # Expired and cancelled jobs still return whatever finished before they stopped
+    texts = backend.results(job_id) if status in TERMINAL_STATUSES else {}
+    drafts: List[EmailDraft] = []
+    generated = 0
+    for request, lead in zip(requests, leads):
+        text = texts.get(request["custom_id"])
+        draft = None
+        if text:
+            try:
+                if custom_subject:
+                    draft = EmailDraft(subject=custom_subject, body=clean_draft_body(text))
+                else:
+                    draft = draft_from_combined(text, background_summary)
+            except ValueError:
+                draft = None
+        if draft is None:
+            draft = generate_email(lead, portfolio_url, background_summary, tone, custom_subject, resume_url)
+        else:
+            generated += 1
+        drafts.append(draft)
+    return BatchDraftResult(drafts=drafts, job_id=job_id, status=status,
+                            generated=generated, fallbacks=len(leads) - generated)
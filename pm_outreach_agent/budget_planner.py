@@ -0,0 +1,99 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+@dataclass
+class ProviderBudget:
+    name: str
+    remaining_today: int
+    remaining_month: int
+    # Probability a call returns leads, from observed history (smoothed)
+    hit_probability: float
+    expected_cost_ms: float = 0.0
+
+    @property
+    def capacity(self) -> int:
+        """Calls this provider can take in the batch without crossing either quota"""
+        return max(0, min(self.remaining_today, self.remaining_month))
+
+
+@dataclass
+class DomainAssignment:
+    domain: str
+    provider: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def status(self) -> str:
+        if self.cached:
+            return "cached"
+        return "planned" if self.provider else "over budget"
+
+
+@dataclass
+class BatchPlan:
+    assignments: List[DomainAssignment]
+    budgets: List[ProviderBudget]
+    credits_by_provider: Dict[str, int] = field(default_factory=dict)
+    expected_hits: float = 0.0
+
+    @property
+    def cached(self) -> List[str]:
+        return [item.domain for item in self.assignments if item.cached]
+
+    @property
+    def planned(self) -> List[str]:
+        return [item.domain for item in self.assignments if item.provider]
+
+    @property
+    def over_budget(self) -> List[str]:
+        return [item.domain for item in self.assignments if not item.cached and not item.provider]
+
+    @property
+    def credits_needed(self) -> int:
+        return sum(self.credits_by_provider.values())
+
+    def provider_map(self) -> Dict[str, str]:
+        """Domain -> planned provider, for the domains that need a provider call"""
+        return {item.domain: item.provider for item in self.assignments if item.provider}
+
+
+def plan_batch(domains: Sequence[str], cached_domains: Iterable[str], budgets: Sequence[ProviderBudget]) -> BatchPlan:
+    """Assign each uncached domain one provider call, spending credits where leads are most likely.
+
+    Every lookup costs one credit whatever it returns, so expected leads found
+    within quota are maximised by filling the providers with the highest hit
+    probability first (faster providers break ties). Cached domains cost
+    nothing; domains beyond the combined capacity are left unassigned.
+    """
+    cached = set(cached_domains)
+    ordered = sorted(budgets, key=lambda budget: (-budget.hit_probability, budget.expected_cost_ms))
+    capacity = {budget.name: budget.capacity for budget in ordered}
+    credits: Dict[str, int] = {}
+    expected_hits = 0.0
+
+    assignments: List[DomainAssignment] = []
+    seen = set()
+    for domain in domains:
+        if domain in seen:
+            continue
+        seen.add(domain)
+        if domain in cached:
+            assignments.append(DomainAssignment(domain=domain, cached=True))
+            continue
+        assignment = DomainAssignment(domain=domain)
+        for budget in ordered:
+            if capacity[budget.name] > 0:
+                capacity[budget.name] -= 1
+                credits[budget.name] = credits.get(budget.name, 0) + 1
+                expected_hits += budget.hit_probability
+                assignment.provider = budget.name
+                break
+        assignments.append(assignment)
+
+    return BatchPlan(
+        assignments=assignments,
+        budgets=list(ordered),
+        credits_by_provider=credits,
+        expected_hits=round(expected_hits, 1),
+    )
@@ -0,0 +1,78 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from .models import CompanyInput, Lead
+
+
+DEFAULT_DISCOVERY_WORKERS = 8
+
+
+@dataclass
+class DiscoveryResult:
+    company: CompanyInput
+    leads: List[Lead]
+    error: Optional[Exception] = None
+
+
+class ProviderSlots:
+    """Process-wide concurrency caps per lead provider.
+
+    Every discovery worker that talks to a provider holds one of its slots, so a
+    large worker pool cannot exceed what a single provider account tolerates.
+    Providers without a configured cap are unbounded.
+    """
+
+    def __init__(self, caps: Optional[Dict[str, int]] = None) -> None:
+        self._lock = threading.Lock()
+        self._caps: Dict[str, int] = {}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self.configure(caps or {})
+
+    def configure(self, caps: Dict[str, int]) -> None:
+        with self._lock:
+            self._caps = {name: int(cap) for name, cap in caps.items() if cap and int(cap) > 0}
+            self._semaphores = {name: threading.BoundedSemaphore(cap) for name, cap in self._caps.items()}
+
+    def cap(self, provider: str) -> Optional[int]:
+        return self._caps.get(provider)
+
+    @contextmanager
+    def hold(self, provider: str) -> Iterator[None]:
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            yield
+            return
+        with semaphore:
+            yield
+
+
+def discover_leads(
+    companies: Sequence[CompanyInput],
+    fetch: Callable[[CompanyInput], List[Lead]],
+    max_workers: int = DEFAULT_DISCOVERY_WORKERS,
+) -> Iterator[DiscoveryResult]:
+    """Fetch leads for many companies concurrently.
+
+    Results are yielded in the same order as ``companies`` as soon as each one
+    (and every company before it) has finished, so downstream output stays
+    deterministic regardless of which domain answers first. A failing fetch is
+    reported through ``DiscoveryResult.error`` instead of aborting the run.
+    """
+    if not companies:
+        return
+    workers = max(1, min(int(max_workers or 1), len(companies)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lead-discovery")
+    try:
+        futures = [executor.submit(fetch, company) for company in companies]
+        for company, future in zip(companies, futures):
+            try:
+                leads = future.result()
+            except Exception as exc:
+                yield DiscoveryResult(company=company, leads=[], error=exc)
+                continue
+            yield DiscoveryResult(company=company, leads=leads or [])
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -1,10 +1,16 @@
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
 
+from .lead_filter import role_priority
 from .models import Lead, EmailDraft
 from .utils import clean_multiline
 from .openai_client import OpenAIDraftClient
 
 
+# How many leads share one OpenAI draft: each lead, each company, or each seniority tier within a company
+DRAFT_REUSE_MODES = ("lead", "company", "role_tier")
+
+
 def build_subject(lead: Lead, custom_subject: Optional[str] = None) -> str:
     if custom_subject:
         return custom_subject
@@ -41,6 +47,69 @@ def generate_email(lead: Lead, portfolio_url: str, background_summary: str, tone
     return EmailDraft(subject=subject, body=body)
 
 
+def personalize_text(text: str, lead: Lead) -> str:
+    if not text:
+        return text
+    replacements = {
+        "{first_name}": lead.first_name or "there",
+        "{last_name}": lead.last_name or "",
+        "{full_name}": lead.full_name,
+        "{company}": lead.company or "",
+        "{role}": lead.role or "",
+        "{{first_name}}": lead.first_name or "there",
+        "{{last_name}}": lead.last_name or "",
+        "{{full_name}}": lead.full_name,
+        "{{company}}": lead.company or "",
+        "{{role}}": lead.role or "",
+    }
+    output = text
+    for token, value in replacements.items():
+        output = output.replace(token, value)
+    return output
+
+
+def ensure_greeting(body: str, lead: Lead) -> str:
+    if not body:
+        return body
+    lines = body.splitlines()
+    first_line = lines[0].strip() if lines else ""
+    greeting = f"Hi {lead.first_name or 'there'},"
+    if first_line.lower().startswith(("hi ", "hello", "hey")):
+        lines[0] = greeting
+        return "\n".join(lines)
+    return "\n".join([greeting, ""] + lines)
+
+
+def personalize_draft(draft: EmailDraft, lead: Lead) -> EmailDraft:
+    """Fill a shared draft's placeholders for one lead and greet them by name"""
+    return EmailDraft(
+        subject=personalize_text(draft.subject, lead),
+        body=ensure_greeting(personalize_text(draft.body, lead), lead),
+    )
+
+
+def group_leads(leads: Sequence[Lead], reuse: str, seniority: Optional[Sequence[str]] = None) -> List[List[int]]:
+    """Indices of ``leads`` that can share a draft, groups in order of first appearance"""
+    groups: Dict[Tuple[str, int], List[int]] = {}
+    for index, lead in enumerate(leads):
+        tier = role_priority(lead.role, seniority) if reuse == "role_tier" else 0
+        groups.setdefault(((lead.company or "").strip().lower(), tier), []).append(index)
+    return list(groups.values())
+
+
+def _placeholder_lead(lead: Lead) -> Lead:
+    # Personal fields become tokens the model writes into the draft and personalize_text
+    # fills in for each lead; the draft's own wording is never rewritten afterwards
+    return Lead(
+        first_name="{first_name}",
+        last_name="{last_name}",
+        role="{role}",
+        email="",
+        confidence=lead.confidence,
+        company=lead.company,
+    )
+
+
 def generate_emails(
     leads: List[Lead],
     portfolio_url: str,
@@ -49,15 +118,49 @@ def generate_emails(
     openai_client: Optional[OpenAIDraftClient] = None,
     custom_subject: Optional[str] = None,
     resume_url: Optional[str] = None,
+    max_workers: int = 1,
+    reuse: str = "lead",
+    seniority: Optional[Sequence[str]] = None,
 ) -> List[EmailDraft]:
-    drafts: List[EmailDraft] = []
-    for lead in leads:
+    """One draft per lead, in lead order.
+
+    With an OpenAI client and ``max_workers`` above one, up to that many leads
+    are drafted at once. Each request is bounded by the client's timeout, and
+    any lead whose OpenAI draft fails gets the template draft instead.
+
+    ``reuse`` set to "company" asks OpenAI for one draft per company, and
+    "role_tier" for one per seniority tier (``seniority`` order) within a
+    company; every lead in the group then gets that draft personalized with
+    their own name and role, so OpenAI calls grow with companies, not leads.
+    """
+    def draft(lead: Lead) -> EmailDraft:
         if openai_client:
             try:
-                drafts.append(openai_client.generate_email(lead, portfolio_url, background_summary, tone, 
-                                                          custom_subject=custom_subject, resume_url=resume_url))
-                continue
+                return openai_client.generate_email(lead, portfolio_url, background_summary, tone,
+                                                    custom_subject=custom_subject, resume_url=resume_url)
             except Exception:
                 pass
-        drafts.append(generate_email(lead, portfolio_url, background_summary, tone, custom_subject, resume_url))
+        return generate_email(lead, portfolio_url, background_summary, tone, custom_subject, resume_url)
+
+    def draft_all(items: List[Lead]) -> List[EmailDraft]:
+        workers = max(1, min(int(max_workers or 1), len(items)))
+        if not openai_client or workers == 1:
+            return [draft(lead) for lead in items]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="email-drafts") as executor:
+            return list(executor.map(draft, items))
+
+    if not openai_client or reuse not in DRAFT_REUSE_MODES or reuse == "lead":
+        return draft_all(list(leads))
+
+    groups = group_leads(leads, reuse, seniority)
+    bases = draft_all([
+        leads[group[0]] if len(group) == 1 else _placeholder_lead(leads[group[0]]) for group in groups
+    ])
+    drafts: List[Optional[EmailDraft]] = [None] * len(leads)
+    for group, base in zip(groups, bases):
+        if len(group) == 1:
+            drafts[group[0]] = base
+            continue
+        for index in group:
+            drafts[index] = personalize_draft(base, leads[index])
     return drafts
@@ -0,0 +1,79 @@
+import os
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# One pooled connection per gunicorn thread (`--threads 4`) for each provider host.
+DEFAULT_POOL_MAXSIZE = int(os.getenv("PROVIDER_POOL_MAXSIZE", "4"))
+# Distinct hosts kept warm: hunter, apollo, snov, findthatlead plus headroom.
+DEFAULT_POOL_CONNECTIONS = int(os.getenv("PROVIDER_POOL_CONNECTIONS", "8"))
+DEFAULT_RETRIES = int(os.getenv("PROVIDER_HTTP_RETRIES", "3"))
+DEFAULT_BACKOFF_FACTOR = float(os.getenv("PROVIDER_HTTP_BACKOFF", "0.5"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Apollo's search POST spends credits, so only repeat a POST the provider turned away unprocessed.
+POST_RETRY_STATUSES = (429, 503)
+MAX_RETRY_AFTER_SECONDS = 10.0
+
+
+class _CappedRetry(Retry):
+    """Retry that honours Retry-After but never parks a web thread for long."""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, MAX_RETRY_AFTER_SECONDS)
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method and method.upper() == "POST" and status_code not in POST_RETRY_STATUSES:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def build_retry(total: int = DEFAULT_RETRIES, backoff_factor: float = DEFAULT_BACKOFF_FACTOR) -> Retry:
+    return _CappedRetry(
+        total=total,
+        # A read timeout already cost the full request timeout and the provider may have
+        # handled the call; repeating it would outlast gunicorn's --timeout 120.
+        read=False,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        # Connect failures never reached the provider; POST status retries are narrowed in is_retry.
+        allowed_methods=frozenset({"GET", "POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def build_session(
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    retries: Optional[Retry] = None,
+) -> requests.Session:
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retries if retries is not None else build_retry(),
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_provider_session() -> requests.Session:
+    """Shared keep-alive session used by every lead provider client in this process."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
@@ -3,19 +3,21 @@ import requests
 
 from .models import Lead
 from .utils import log_action, normalize_domain
+from .http_transport import get_provider_session
 
 
 class HunterClient:
-    def __init__(self, api_key: str, timeout_seconds: int = 30) -> None:
+    def __init__(self, api_key: str, timeout_seconds: int = 30, session: requests.Session | None = None) -> None:
         self.api_key = api_key.strip()
         self.timeout_seconds = timeout_seconds
         self.base_url = "https://api.hunter.io/v2"
+        self.session = session or get_provider_session()
 
     def _get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
         url = f"{self.base_url}{path}"
         params = {**params, "api_key": self.api_key}
         log_action(f"Calling Hunter API: {path}")
-        response = requests.get(url, params=params, timeout=self.timeout_seconds)
+        response = self.session.get(url, params=params, timeout=self.timeout_seconds)
         response.raise_for_status()
         return response.json()
 
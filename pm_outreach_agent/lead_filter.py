@@ -1,7 +1,10 @@
-from typing import List
+import heapq
+from dataclasses import replace
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
 
-from .models import Lead, RankedLead
-from .utils import contains_role, normalize_role
+from .models import Lead, LeadBatch, RankedLead
+from .role_matcher import EXCLUDED, TARGET, get_role_matcher
 
 
 SENIORITY_ORDER = [
@@ -15,32 +18,116 @@ SENIORITY_ORDER = [
 ]
 
 
-def role_priority(role: str) -> int:
-    normalized = normalize_role(role)
-    for idx, key in enumerate(SENIORITY_ORDER):
-        if key in normalized:
-            return len(SENIORITY_ORDER) - idx
-    return 0
+def seniority_matcher(seniority: Optional[Sequence[str]]):
+    if seniority:
+        # Profile tables hold short titles ("CTO", "Partner") that must not match inside other words
+        return get_role_matcher(seniority=seniority, whole_words=True)
+    return get_role_matcher(seniority=SENIORITY_ORDER)
 
 
-def filter_leads(leads: List[Lead], target_roles: List[str], excluded_roles: List[str], min_confidence: int) -> List[Lead]:
-    filtered: List[Lead] = []
+def role_priority(role: str, seniority: Optional[Sequence[str]] = None) -> int:
+    return seniority_matcher(seniority).priority(role)
+
+
+def iter_filtered_leads(leads: Iterable[Lead], target_roles: List[str], excluded_roles: List[str], min_confidence: int) -> Iterator[Lead]:
+    matcher = get_role_matcher(target_roles, excluded_roles)
+    require_target = bool(target_roles)
     for lead in leads:
         if lead.confidence < min_confidence:
             continue
-        if excluded_roles and contains_role(excluded_roles, lead.role):
+        flags = matcher.classify(lead.role)[0]
+        if flags & EXCLUDED:
             continue
-        if target_roles and not contains_role(target_roles, lead.role):
+        if require_target and not flags & TARGET:
             continue
-        filtered.append(lead)
-    return filtered
+        yield lead
+
+
+def filter_leads(leads: List[Lead], target_roles: List[str], excluded_roles: List[str], min_confidence: int) -> List[Lead]:
+    return list(iter_filtered_leads(leads, target_roles, excluded_roles, min_confidence))
 
 
-def rank_leads(leads: List[Lead]) -> List[RankedLead]:
+def rank_leads(leads: List[Lead], seniority: Optional[Sequence[str]] = None) -> List[RankedLead]:
+    """Sort by seniority then confidence; ``seniority`` is a profile table (default SENIORITY_ORDER)."""
+    classify = seniority_matcher(seniority).classify
     ranked: List[RankedLead] = []
     for lead in leads:
-        seniority_score = role_priority(lead.role)
+        seniority_score = classify(lead.role)[1]
         score = seniority_score * 100 + lead.confidence
         ranked.append(RankedLead(lead=lead, score=score))
     ranked.sort(key=lambda item: item.score, reverse=True)
     return ranked
+
+
+def rank_top_leads(leads: Iterable[Lead], k: int, seniority: Optional[Sequence[str]] = None) -> List[RankedLead]:
+    """The first ``k`` of ``rank_leads(leads)``, using O(k) memory.
+
+    Consumes any iterable (e.g. ``iter_filtered_leads``) through a bounded heap,
+    so only the winners become ``RankedLead`` objects. Ties keep input order,
+    as with ``rank_leads``.
+    """
+    if k <= 0:
+        return []
+    classify = seniority_matcher(seniority).classify
+    scored = ((classify(lead.role)[1] * 100 + lead.confidence, lead) for lead in leads)
+    return [RankedLead(lead=lead, score=score) for score, lead in heapq.nlargest(k, scored, key=itemgetter(0))]
+
+
+def merge_leads(leads: Iterable[Lead]) -> List[Lead]:
+    """Collapse leads sharing an email (case-insensitive), first-seen order.
+
+    Blank names and roles are filled from later duplicates and the highest
+    confidence wins, so the same person from two providers becomes one lead.
+    """
+    merged: Dict[str, Lead] = {}
+    for lead in leads:
+        key = lead.email.lower().strip()
+        if not key:
+            continue
+        current = merged.get(key)
+        if current is None:
+            merged[key] = replace(lead, email=lead.email.strip())
+            continue
+        current.first_name = current.first_name or lead.first_name
+        current.last_name = current.last_name or lead.last_name
+        current.role = current.role or lead.role
+        current.company = current.company or lead.company
+        current.confidence = max(current.confidence, lead.confidence)
+    return list(merged.values())
+
+
+def dedupe_lead_batch(batch: LeadBatch) -> LeadBatch:
+    """Drop rows with a blank or repeated email (case-insensitive), keeping the first."""
+    keys = [email.lower().strip() for email in batch.emails]
+    # Walking backwards leaves each key mapped to its first row
+    first = dict(zip(reversed(keys), range(len(keys) - 1, -1, -1)))
+    keep = sorted(index for key, index in first.items() if key)
+    return batch if len(keep) == len(batch) else batch.take(keep)
+
+
+def filter_lead_batch(batch: LeadBatch, target_roles: List[str], excluded_roles: List[str], min_confidence: int) -> LeadBatch:
+    classify = get_role_matcher(target_roles, excluded_roles).classify
+    require_target = bool(target_roles)
+    # Classify each distinct title once, then sweep the columns
+    allowed = []
+    for role in batch.role_values:
+        flags = classify(role)[0]
+        allowed.append(not flags & EXCLUDED and (not require_target or bool(flags & TARGET)))
+    confidences = batch.confidences
+    keep = [
+        index for index, code in enumerate(batch.role_codes)
+        if allowed[code] and confidences[index] >= min_confidence
+    ]
+    return batch.take(keep)
+
+
+def rank_lead_batch(batch: LeadBatch, seniority: Optional[Sequence[str]] = None, k: Optional[int] = None) -> List[RankedLead]:
+    """Same order as ``rank_leads(batch.to_leads())``; only the returned rows become Lead objects."""
+    classify = seniority_matcher(seniority).classify
+    priority = [classify(role)[1] * 100 for role in batch.role_values]
+    scores = [priority[code] + confidence for code, confidence in zip(batch.role_codes, batch.confidences)]
+    if k is None:
+        order = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+    else:
+        order = heapq.nlargest(max(0, k), range(len(scores)), key=scores.__getitem__)
+    return [RankedLead(lead=batch.lead(index), score=scores[index]) for index in order]
@@ -1,8 +1,12 @@
-from dataclasses import dataclass
-from typing import Optional
+from array import array
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Sequence
 
 
-@dataclass
+# Slotted: no per-instance __dict__, which matters for large batches and cache loads.
+# Not frozen because callers fill in ``company`` after discovery.
+@dataclass(slots=True)
 class Lead:
     first_name: str
     last_name: str
@@ -17,6 +21,103 @@ class Lead:
         return full if full.strip() else "Unknown"
 
 
+LEAD_FIELDS = ("first_name", "last_name", "role", "email", "confidence", "company")
+
+
+@dataclass
+class LeadBatch:
+    """Columnar leads: one list per field instead of one object per lead.
+
+    The filter, rank and dedupe stages in ``lead_filter`` work on the columns
+    directly and only build ``Lead`` objects for the rows that survive.
+    Roles are also dictionary-encoded: ``role_codes[i]`` indexes
+    ``role_values``, so per-title work is done once per distinct title.
+    """
+
+    first_names: List[str] = field(default_factory=list)
+    last_names: List[str] = field(default_factory=list)
+    roles: List[str] = field(default_factory=list)
+    emails: List[str] = field(default_factory=list)
+    confidences: array = field(default_factory=lambda: array("i"))
+    companies: List[str] = field(default_factory=list)
+    role_values: List[str] = field(default_factory=list)
+    role_codes: array = field(default_factory=lambda: array("i"))
+
+    def __post_init__(self) -> None:
+        self._role_index = {role: code for code, role in enumerate(self.role_values)}
+        if len(self.role_codes) != len(self.roles):
+            self.role_codes = array("i", map(self._encode_role, self.roles))
+
+    def _encode_role(self, role: str) -> int:
+        code = self._role_index.get(role)
+        if code is None:
+            code = self._role_index[role] = len(self.role_values)
+            self.role_values.append(role)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.emails)
+
+    def append(self, first_name: str, last_name: str, role: str, email: str, confidence: int, company: str) -> None:
+        self.first_names.append(first_name)
+        self.last_names.append(last_name)
+        self.roles.append(role)
+        self.role_codes.append(self._encode_role(role))
+        self.emails.append(email)
+        self.confidences.append(int(confidence or 0))
+        self.companies.append(company)
+
+    @classmethod
+    def from_leads(cls, leads: Iterable[Lead]) -> "LeadBatch":
+        batch = cls()
+        for lead in leads:
+            batch.append(lead.first_name, lead.last_name, lead.role, lead.email, lead.confidence, lead.company)
+        return batch
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "LeadBatch":
+        """Build from dicts with Lead field names, e.g. a decoded LeadCache payload."""
+        batch = cls()
+        for record in records:
+            batch.append(*(record[name] for name in LEAD_FIELDS))
+        return batch
+
+    def lead(self, index: int) -> Lead:
+        return Lead(
+            self.first_names[index],
+            self.last_names[index],
+            self.roles[index],
+            self.emails[index],
+            self.confidences[index],
+            self.companies[index],
+        )
+
+    def take(self, indices: Sequence[int]) -> "LeadBatch":
+        """Rows at ``indices``, in that order."""
+        if len(indices) < 2:
+            # itemgetter returns a bare value rather than a tuple for a single index
+            def gather(column):
+                return [column[i] for i in indices]
+        else:
+            getter = itemgetter(*indices)
+
+            def gather(column):
+                return list(getter(column))
+        return LeadBatch(
+            first_names=gather(self.first_names),
+            last_names=gather(self.last_names),
+            roles=gather(self.roles),
+            emails=gather(self.emails),
+            confidences=array("i", gather(self.confidences)),
+            companies=gather(self.companies),
+            role_values=list(self.role_values),
+            role_codes=array("i", gather(self.role_codes)),
+        )
+
+    def to_leads(self, indices: Optional[Sequence[int]] = None) -> List[Lead]:
+        return [self.lead(i) for i in (range(len(self)) if indices is None else indices)]
+
+
 @dataclass
 class CompanyInput:
     name: str
@@ -4,15 +4,54 @@ Scales for production use with multiple users - BYOK (Bring Your Own Keys) model
 """
 import os
 import json
+import time
+import threading
 import requests
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, TYPE_CHECKING
-from database import db, LeadCache, APICallLog
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Dict, Tuple, TYPE_CHECKING
+from flask import current_app
+from sqlalchemy import func
+from database import db, LeadCache, APICallLog, APICallDailyRollup
 
 if TYPE_CHECKING:
     from database import User
 
 from pm_outreach_agent.models import Lead
+from pm_outreach_agent.lead_filter import merge_leads
+from pm_outreach_agent.discovery import ProviderSlots
+from pm_outreach_agent.http_transport import get_provider_session
+from pm_outreach_agent.token_cache import AccessTokenCache
+from pm_outreach_agent.memory_cache import LRUCache
+from pm_outreach_agent.single_flight import SingleFlight
+from pm_outreach_agent.provider_stats import ProviderStats, HIT, EMPTY, ERROR
+from pm_outreach_agent.rate_limiter import SlidingWindowLimiter
+from pm_outreach_agent.write_behind import WriteBehindQueue
+from pm_outreach_agent.budget_planner import BatchPlan, ProviderBudget, plan_batch
+
+
+# Snov.io OAuth tokens shared by every thread in this process, keyed by client id
+snov_tokens = AccessTokenCache()
+
+# Providers return the same people whatever profile is searched, so raw responses are
+# cached once per domain under this domain_type and filtered per profile on read.
+ALL_DOMAIN_TYPES = '*'
+
+# Lookup strategies: 'fallback' tries providers one at a time in order;
+# 'race' fires the first few enabled providers at once and keeps the first non-empty answer;
+# 'aggregate' queries every available provider at once and merges the answers for maximum recall.
+STRATEGIES = ('fallback', 'race', 'aggregate')
+RACE_TIMEOUT_SECONDS = 45
+
+# Successful (lead-yielding) calls allowed per user and provider in a rolling window
+DAILY_CALL_LIMIT = 10
+RATE_LIMIT_WINDOW_HOURS = 24
+
+
+def _epoch(created_at: datetime) -> float:
+    """APICallLog timestamps are naive UTC"""
+    return created_at.replace(tzinfo=timezone.utc).timestamp()
 
 
 class MultiProviderEmailFinder:
@@ -20,11 +59,52 @@ class MultiProviderEmailFinder:
     Scalable email finder with:
     - User-specific API keys (stored encrypted in database)
     - Multiple API providers with automatic fallback
-    - Result caching (7 days) to avoid duplicate API calls
+    - Result caching (7 days) to avoid duplicate API calls, shared by every domain type
     - Rate limiting per user
     - Provider rotation to distribute load
+    - Per-provider concurrency caps for concurrent batch discovery
+    - Pooled keep-alive HTTP sessions with retry/backoff for 429/5xx
+    - In-process LRU tier in front of the LeadCache table
+    - Single-flight coalescing of concurrent identical searches
+    - Optional provider racing, with per-provider latency and outcome stats
+    - Adaptive provider ordering from observed latency and hit rate
+    - Aggregate mode merging every provider's leads, deduped by email
+    - In-memory sliding-window rate limits, warmed from APICallLog
+    - Write-behind APICallLog logging, flushed in bulk off the request path
+    - Credit-aware batch planning across providers
     """
     
+    def __init__(self, provider_slots: Optional[ProviderSlots] = None, session: Optional[requests.Session] = None,
+                 memory_cache: Optional[LRUCache] = None):
+        self.provider_slots = provider_slots or ProviderSlots()
+        self.session = session or get_provider_session()
+        self.memory_cache = memory_cache or LRUCache(
+            maxsize=int(os.getenv('LEAD_CACHE_MEMORY_SIZE', '512')),
+            ttl=float(os.getenv('LEAD_CACHE_MEMORY_TTL', '300')),
+        )
+        self.inflight = SingleFlight()
+        self.provider_stats = ProviderStats()
+        strategy = os.getenv('LEAD_FINDER_STRATEGY', 'fallback')
+        self.strategy = strategy if strategy in STRATEGIES else 'fallback'
+        self.race_width = int(os.getenv('LEAD_FINDER_RACE_WIDTH', '2'))
+        self.adaptive_order = os.getenv('LEAD_FINDER_ADAPTIVE_ORDER', '1') != '0'
+        self._race_pool = None
+        self._race_pool_lock = threading.Lock()
+        self.rate_limiter = SlidingWindowLimiter(
+            limit=DAILY_CALL_LIMIT,
+            window_seconds=RATE_LIMIT_WINDOW_HOURS * 3600,
+            loader=self._load_successful_calls,
+            resync_seconds=float(os.getenv('RATE_LIMIT_RESYNC_SECONDS', '300')),
+        )
+        self.buffered_logging = os.getenv('API_LOG_BUFFERED', '1') != '0'
+        self.call_log_writer = WriteBehindQueue(
+            self._write_call_logs,
+            max_batch=int(os.getenv('API_LOG_FLUSH_SIZE', '50')),
+            flush_interval=float(os.getenv('API_LOG_FLUSH_SECONDS', '2')),
+            name='api-call-log-writer',
+        )
+        self._log_app = None
+    
     def get_user_providers(self, user: 'User') -> Dict:
         """Get provider config for a specific user's API keys"""
         env_hunter = os.getenv('HUNTER_API_KEY')
@@ -57,7 +137,8 @@ class MultiProviderEmailFinder:
             }
         }
     
-    def find_leads(self, domain: str, domain_type: str, user: 'User') -> List[Lead]:
+    def find_leads(self, domain: str, domain_type: str, user: 'User', strategy: Optional[str] = None,
+                   preferred_provider: Optional[str] = None) -> List[Lead]:
         """
         Find leads with caching and multi-provider fallback using user's API keys
         
@@ -65,71 +146,287 @@ class MultiProviderEmailFinder:
             domain: Company domain
             domain_type: Type of company (pm, consulting, etc.)
             user: User object with their API keys
+            strategy: 'fallback', 'race' or 'aggregate' (defaults to LEAD_FINDER_STRATEGY)
+            preferred_provider: Provider to try first, e.g. from plan_batch
         
         Returns:
-            List of Lead objects
+            List of Lead objects - the raw provider response for the domain.
+            Callers apply the domain type's roles with filter_leads.
         """
+        strategy = strategy if strategy in STRATEGIES else self.strategy
+        
         # Get user's configured providers
         providers = self.get_user_providers(user)
+        if preferred_provider in providers:
+            providers[preferred_provider]['preferred'] = True
         
         # 0. Check if user has any providers configured
         if not any(p['enabled'] for p in providers.values()):
             print(f"❌ User {user.email} has no email providers configured.")
             return []
         
-        # 1. Check cache first
-        cached = self._get_from_cache(domain, domain_type)
+        # 1. Check cache first (one entry per domain serves every domain type)
+        cached = self._get_from_cache(domain)
         if cached:
             print(f"✅ Cache hit! Using cached results for {domain}")
             return cached
         
-        # 2. Try each provider in order
-        for provider_name, config in providers.items():
+        # 2. Concurrent misses for the same domain share one provider fetch
+        (_, leads), shared = self.inflight.do(
+            domain,
+            lambda: (user.id, self._fetch_uncached(domain, domain_type, user, providers, strategy)),
+            # Another user's empty answer says nothing about this user's keys; their
+            # retry goes through the single-flight too, so same-user waiters share it
+            share=lambda result: bool(result[1]) or result[0] == user.id,
+        )
+        if shared and leads:
+            print(f"🔗 Joined in-flight search for {domain}")
+        return list(leads)
+    
+    def _fetch_uncached(self, domain: str, domain_type: str, user: 'User', providers: Dict, strategy: str) -> List[Lead]:
+        """Provider fetch run once per domain; re-checks the cache in case a just-finished flight filled it"""
+        cached = self._get_from_cache(domain)
+        if cached:
+            print(f"✅ Cache hit! Using cached results for {domain}")
+            return cached
+        return self._fetch_with_strategy(domain, domain_type, user, providers, strategy)
+    
+    def _fetch_with_strategy(self, domain: str, domain_type: str, user: 'User', providers: Dict, strategy: str) -> List[Lead]:
+        if strategy == 'race':
+            return self._fetch_race(domain, domain_type, user, providers)
+        if strategy == 'aggregate':
+            return self._fetch_aggregate(domain, domain_type, user, providers)
+        return self._fetch_with_fallback(domain, domain_type, user, providers)
+    
+    def _available_providers(self, user: 'User', providers: Dict) -> List[str]:
+        """Enabled providers the user has not exhausted today, fastest expected first"""
+        order = list(providers)
+        if self.adaptive_order:
+            order = self.provider_stats.rank(order, user_id=user.id)
+        # A planned provider goes first; the rest stay as fallbacks
+        order.sort(key=lambda name: not providers[name].get('preferred'))
+        available = []
+        for provider_name in order:
+            config = providers[provider_name]
             if not config['enabled']:
                 continue
-            
             # Check if user has hit rate limit with this provider
             if self._is_rate_limited(user.id, provider_name):
                 print(f"⚠️  Rate limit reached for {provider_name}, trying next provider...")
                 continue
-            
-            try:
-                print(f"🔍 Trying {provider_name} with user's API key...")
-                leads = self._fetch_from_provider(provider_name, domain, domain_type, config)
-                
+            available.append(provider_name)
+        return available
+    
+    def _fetch_with_fallback(self, domain: str, domain_type: str, user: 'User', providers: Dict) -> List[Lead]:
+        """Try each enabled provider in order until one returns leads"""
+        for provider_name in self._available_providers(user, providers):
+            print(f"🔍 Trying {provider_name} with user's API key...")
+            leads = self._attempt_provider(user.id, provider_name, domain, domain_type, providers[provider_name])
+            if leads:
+                # Success! Cache results
+                self._save_to_cache(domain, leads, provider_name)
+                print(f"✅ Success! Found {len(leads)} leads using {provider_name}")
+                return leads
+        
+        # 3. All providers failed
+        print("❌ All user's providers exhausted or failed")
+        return []
+    
+    def _fetch_race(self, domain: str, domain_type: str, user: 'User', providers: Dict) -> List[Lead]:
+        """Fire the first race_width available providers in parallel and keep the first non-empty result"""
+        contenders = self._available_providers(user, providers)[:max(1, self.race_width)]
+        if not contenders:
+            print("❌ All user's providers exhausted or failed")
+            return []
+        
+        print(f"🏁 Racing {', '.join(contenders)} for {domain}")
+        app = current_app._get_current_object()
+        pool = self._get_race_pool()
+        futures = {
+            pool.submit(self._attempt_in_app, app, user.id, name, domain, domain_type, providers[name]): name
+            for name in contenders
+        }
+        try:
+            for future in as_completed(futures, timeout=RACE_TIMEOUT_SECONDS):
+                leads = future.result()
                 if leads:
-                    # Success! Cache results and log API call
-                    self._save_to_cache(domain, domain_type, leads, provider_name)
-                    self._log_api_call(user.id, provider_name, domain, success=True)
-                    
-                    print(f"✅ Success! Found {len(leads)} leads using {provider_name}")
+                    provider_name = futures[future]
+                    # Stragglers keep running in the pool and log their own outcome
+                    self._save_to_cache(domain, leads, provider_name)
+                    print(f"✅ {provider_name} won the race with {len(leads)} leads")
                     return leads
-                    
-            except Exception as e:
-                print(f"❌ {provider_name} failed: {e}")
-                self._log_api_call(user.id, provider_name, domain, success=False)
-                continue
+        except FuturesTimeout:
+            print(f"⚠️  Provider race for {domain} timed out after {RACE_TIMEOUT_SECONDS}s")
+            self._cache_late_results(app, domain, futures)
         
-        # 3. All providers failed
         print("❌ All user's providers exhausted or failed")
         return []
     
-    def _get_from_cache(self, domain: str, domain_type: str) -> Optional[List[Lead]]:
+    def _fetch_aggregate(self, domain: str, domain_type: str, user: 'User', providers: Dict) -> List[Lead]:
+        """Query every available provider in parallel and merge their leads, deduped by email"""
+        contenders = self._available_providers(user, providers)
+        if not contenders:
+            print("❌ All user's providers exhausted or failed")
+            return []
+        
+        print(f"🧺 Aggregating {', '.join(contenders)} for {domain}")
+        app = current_app._get_current_object()
+        pool = self._get_race_pool()
+        futures = {
+            pool.submit(self._attempt_in_app, app, user.id, name, domain, domain_type, providers[name]): name
+            for name in contenders
+        }
+        results = {}
+        timed_out = False
+        try:
+            for future in as_completed(futures, timeout=RACE_TIMEOUT_SECONDS):
+                results[futures[future]] = future.result()
+        except FuturesTimeout:
+            timed_out = True
+            print(f"⚠️  Aggregating {domain} timed out after {RACE_TIMEOUT_SECONDS}s, merging what arrived")
+        
+        # Merge in provider order so the best-ranked provider's fields win ties
+        contributors = [name for name in contenders if results.get(name)]
+        leads = merge_leads(lead for name in contributors for lead in results[name])
+        if leads:
+            self._save_to_cache(domain, leads, '+'.join(contributors))
+        if timed_out:
+            self._cache_late_results(app, domain, futures, leads, contributors)
+        if not leads:
+            print("❌ All user's providers exhausted or failed")
+            return []
+        
+        total = sum(len(results[name]) for name in contributors)
+        print(f"✅ Merged {total} leads from {', '.join(contributors)} into {len(leads)} unique")
+        return leads
+    
+    def _cache_late_results(self, app, domain: str, futures: Dict, leads: Optional[List[Lead]] = None,
+                            contributors: Optional[List[str]] = None):
+        """Cache answers from providers still running when a race or aggregate timed out.
+
+        The timeout also covers time spent queued in the shared race pool, so a
+        provider can answer after its search gave up. Late leads are merged into
+        what the search already cached; the next lookup for the domain gets them
+        without calling the provider again.
+        """
+        lock = threading.Lock()
+        state = {'leads': list(leads or []), 'contributors': list(contributors or [])}
+        
+        def save_late(future, provider_name: str):
+            if future.cancelled() or future.exception() is not None:
+                return
+            late = future.result()
+            if not late:
+                return
+            with lock:
+                state['leads'] = merge_leads(state['leads'] + late)
+                state['contributors'].append(provider_name)
+                with app.app_context():
+                    self._save_to_cache(domain, state['leads'], '+'.join(state['contributors']))
+            print(f"✅ Cached {len(late)} late leads from {provider_name} for {domain}")
+        
+        # Futures that finished since the timeout run their callback right away
+        for future, provider_name in futures.items():
+            if provider_name not in state['contributors']:
+                future.add_done_callback(lambda done, name=provider_name: save_late(done, name))
+    
+    def _get_race_pool(self) -> ThreadPoolExecutor:
+        if self._race_pool is None:
+            with self._race_pool_lock:
+                if self._race_pool is None:
+                    self._race_pool = ThreadPoolExecutor(
+                        max_workers=int(os.getenv('LEAD_FINDER_RACE_WORKERS', '8')),
+                        thread_name_prefix='provider-race',
+                    )
+        return self._race_pool
+    
+    def _attempt_in_app(self, app, user_id: int, provider: str, domain: str, domain_type: str, config: Dict) -> List[Lead]:
+        with app.app_context():
+            return self._attempt_provider(user_id, provider, domain, domain_type, config)
+    
+    def _attempt_provider(self, user_id: int, provider: str, domain: str, domain_type: str, config: Dict) -> List[Lead]:
+        """Call one provider, timing it and logging the outcome; returns [] on failure"""
+        started = time.perf_counter()
+        try:
+            leads = self._fetch_from_provider(provider, domain, domain_type, config)
+        except Exception as e:
+            latency_ms = int((time.perf_counter() - started) * 1000)
+            print(f"❌ {provider} failed: {e}")
+            self.provider_stats.record(provider, latency_ms, ERROR, user_id=user_id)
+            self._log_api_call(user_id, provider, domain, success=False, latency_ms=latency_ms)
+            return []
+        
+        latency_ms = int((time.perf_counter() - started) * 1000)
+        self.provider_stats.record(provider, latency_ms, HIT if leads else EMPTY, user_id=user_id)
+        self._log_api_call(user_id, provider, domain, success=bool(leads),
+                           latency_ms=latency_ms, lead_count=len(leads))
+        return leads
+    
+    def cached_domains(self, domains: List[str]) -> set:
+        """Which of these domains have a valid cache entry, in one query"""
+        found = {domain for domain in domains if domain in self.memory_cache}
+        missing = [domain for domain in set(domains) if domain not in found]
+        if missing:
+            rows = db.session.query(LeadCache.domain).filter(
+                LeadCache.domain.in_(missing),
+                LeadCache.expires_at > datetime.utcnow()
+            ).distinct().all()
+            found.update(domain for domain, in rows)
+        return found
+    
+    def plan_batch(self, domains: List[str], user: 'User') -> BatchPlan:
+        """Plan which provider each uncached domain should use within the user's remaining quota"""
+        providers = self.get_user_providers(user)
+        month_start = datetime.utcnow().date().replace(day=1)
+        used_this_month = dict(db.session.query(
+            APICallDailyRollup.provider,
+            func.sum(APICallDailyRollup.credits_used)
+        ).filter(
+            APICallDailyRollup.user_id == user.id,
+            APICallDailyRollup.day >= month_start
+        ).group_by(APICallDailyRollup.provider).all())
+        
+        budgets = [
+            ProviderBudget(
+                name=name,
+                remaining_today=self.rate_limiter.remaining((user.id, name)),
+                remaining_month=max(0, config['credits_per_month'] - (used_this_month.get(name) or 0)),
+                hit_probability=self.provider_stats.hit_probability(name, user_id=user.id),
+                expected_cost_ms=self.provider_stats.expected_cost(name, user_id=user.id),
+            )
+            for name, config in providers.items() if config['enabled']
+        ]
+        return plan_batch(domains, self.cached_domains(domains), budgets)
+    
+    def get_cached_leads(self, domain: str) -> Optional[List[Lead]]:
+        """Cached raw leads for a domain (memory first, then database), or None"""
+        return self._get_from_cache(domain)
+    
+    def _get_from_cache(self, domain: str) -> Optional[List[Lead]]:
         """Get cached results if available and valid"""
+        leads = self.memory_cache.get(domain)
+        if leads is not None:
+            return list(leads)
+        
+        # Rows written before caching went domain-wide carry a specific domain_type;
+        # they hold the same raw provider response, so any unexpired row will do.
         cache = LeadCache.query.filter_by(
-            domain=domain,
-            domain_type=domain_type
-        ).first()
+            domain=domain
+        ).order_by(LeadCache.expires_at.desc()).first()
         
         if cache and cache.is_valid():
             # Parse JSON and convert to Lead objects
             leads_data = json.loads(cache.leads_data)
-            return [Lead(**lead_dict) for lead_dict in leads_data]
+            leads = [Lead(**lead_dict) for lead_dict in leads_data]
+            # Never keep an entry in memory longer than the row itself is valid
+            remaining = (cache.expires_at - datetime.utcnow()).total_seconds()
+            self.memory_cache.set(domain, leads, ttl=remaining)
+            return list(leads)
         
         return None
     
-    def _save_to_cache(self, domain: str, domain_type: str, leads: List[Lead], provider: str):
-        """Save results to cache (7 day expiry)"""
+    def _save_to_cache(self, domain: str, leads: List[Lead], provider: str):
+        """Save raw results to the domain-wide cache entry (7 day expiry)"""
         # Convert Lead objects to dicts
         leads_data = [
             {
@@ -143,47 +440,99 @@ class MultiProviderEmailFinder:
             for lead in leads
         ]
         
-        cache = LeadCache(
+        LeadCache.upsert(
             domain=domain,
-            domain_type=domain_type,
+            domain_type=ALL_DOMAIN_TYPES,
             leads_data=json.dumps(leads_data),
             lead_count=len(leads),
             provider=provider,
             expires_at=datetime.utcnow() + timedelta(days=7)
         )
-        
-        db.session.add(cache)
-        db.session.commit()
+        self.memory_cache.invalidate(domain)
     
-    def _is_rate_limited(self, user_id: int, provider: str, window_hours: int = 24) -> bool:
+    def _is_rate_limited(self, user_id: int, provider: str) -> bool:
         """
         Check if user has exceeded rate limit for provider
-        Limit: 10 calls per provider per 24 hours
+        Limit: 10 successful calls per provider per rolling 24 hours
         """
-        since = datetime.utcnow() - timedelta(hours=window_hours)
-        
-        call_count = APICallLog.query.filter(
+        return not self.rate_limiter.allowed((user_id, provider))
+    
+    def _load_successful_calls(self, key: Tuple[int, str]) -> List[float]:
+        """Successful call times for one (user, provider) in the current window, from APICallLog"""
+        user_id, provider = key
+        since = datetime.utcnow() - timedelta(hours=RATE_LIMIT_WINDOW_HOURS)
+        rows = db.session.query(APICallLog.created_at).filter(
             APICallLog.user_id == user_id,
             APICallLog.provider == provider,
             APICallLog.created_at >= since,
             APICallLog.success == True
-        ).count()
-        
-        return call_count >= 10
+        ).order_by(APICallLog.created_at.desc()).limit(DAILY_CALL_LIMIT).all()
+        return [_epoch(created_at) for created_at, in rows]
     
-    def _log_api_call(self, user_id: int, provider: str, domain: str, success: bool):
-        """Log API call for rate limiting"""
-        log = APICallLog(
-            user_id=user_id,
-            provider=provider,
-            domain=domain,
-            success=success
-        )
-        db.session.add(log)
+    def warm_rate_limiter(self) -> int:
+        """Load every user's successful calls in the current window into the limiter"""
+        since = datetime.utcnow() - timedelta(hours=RATE_LIMIT_WINDOW_HOURS)
+        rows = db.session.query(APICallLog.user_id, APICallLog.provider, APICallLog.created_at).filter(
+            APICallLog.created_at >= since,
+            APICallLog.success == True
+        ).all()
+        return self.rate_limiter.warm(((user_id, provider), _epoch(created_at)) for user_id, provider, created_at in rows)
+    
+    def _log_api_call(self, user_id: int, provider: str, domain: str, success: bool,
+                      latency_ms: Optional[int] = None, lead_count: Optional[int] = None):
+        """Log API call for rate limiting (success means leads were returned)"""
+        # The limiter is updated now; the database rows follow in the next bulk flush
+        if success:
+            self.rate_limiter.hit((user_id, provider))
+        entry = {
+            'user_id': user_id,
+            'provider': provider,
+            'domain': domain,
+            'success': success,
+            'credits_used': 1,
+            'latency_ms': latency_ms,
+            'lead_count': lead_count,
+            'created_at': datetime.utcnow()
+        }
+        if not self.buffered_logging:
+            self._insert_call_logs([entry])
+            return
+        if self._log_app is None:
+            self._log_app = current_app._get_current_object()
+        self.call_log_writer.put(entry)
+    
+    def _write_call_logs(self, entries: List[Dict]):
+        """Writer-thread flush: one bulk insert plus rollup increments per batch"""
+        with self._log_app.app_context():
+            try:
+                self._insert_call_logs(entries)
+            finally:
+                db.session.remove()
+    
+    def _insert_call_logs(self, entries: List[Dict]):
+        db.session.execute(APICallLog.__table__.insert(), entries)
+        totals = defaultdict(lambda: [0, 0, 0, 0])
+        for entry in entries:
+            counters = totals[(entry['user_id'], entry['provider'], entry['created_at'].date())]
+            counters[0] += 1
+            counters[1] += 1 if entry['success'] else 0
+            counters[2] += entry['credits_used']
+            counters[3] += entry['lead_count'] or 0
+        for (user_id, provider, day), (calls, successes, credits_used, leads) in totals.items():
+            APICallDailyRollup.increment(user_id, provider, day, calls=calls, successes=successes,
+                                         credits_used=credits_used, leads=leads)
         db.session.commit()
     
+    def flush_call_logs(self) -> int:
+        """Write any buffered API call logs now (also runs at interpreter exit)"""
+        return self.call_log_writer.flush()
+    
     def _fetch_from_provider(self, provider: str, domain: str, domain_type: str, config: Dict) -> List[Lead]:
         """Fetch leads from specific provider using provided config"""
+        with self.provider_slots.hold(provider):
+            return self._dispatch_provider(provider, domain, domain_type, config)
+    
+    def _dispatch_provider(self, provider: str, domain: str, domain_type: str, config: Dict) -> List[Lead]:
         if provider == 'hunter':
             return self._fetch_hunter(domain, domain_type, config)
         elif provider == 'apollo':
@@ -200,7 +549,7 @@ class MultiProviderEmailFinder:
         api_key = config['api_key']
         
         url = f"https://api.hunter.io/v2/domain-search?domain={domain}&api_key={api_key}"
-        response = requests.get(url, timeout=30)
+        response = self.session.get(url, timeout=30)
         response.raise_for_status()
         
         data = response.json()
@@ -234,7 +583,7 @@ class MultiProviderEmailFinder:
             "per_page": 25
         }
         
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response = self.session.post(url, json=payload, headers=headers, timeout=30)
         response.raise_for_status()
         
         data = response.json()
@@ -264,24 +613,19 @@ class MultiProviderEmailFinder:
         api_key = config['api_key']
         client_secret = config['client_secret']
         
-        # First, get access token
-        auth_url = "https://api.snov.io/v1/oauth/access_token"
-        auth_data = {
-            "client_id": api_key,
-            "client_secret": client_secret,
-            "grant_type": "client_credentials"
-        }
-        
-        auth_response = requests.post(auth_url, data=auth_data, timeout=30)
-        auth_response.raise_for_status()
-        access_token = auth_response.json().get('access_token')
+        # Reuse the cached access token for this client id (refreshed shortly before expiry)
+        access_token = snov_tokens.get(api_key, lambda: self._request_snov_token(api_key, client_secret))
         
         # Now search for emails
         search_url = "https://api.snov.io/v1/get-domain-emails-with-info"
-        headers = {"Authorization": f"Bearer {access_token}"}
         params = {"domain": domain, "limit": 25}
         
-        response = requests.get(search_url, headers=headers, params=params, timeout=30)
+        response = self.session.get(search_url, headers={"Authorization": f"Bearer {access_token}"}, params=params, timeout=30)
+        if response.status_code == 401:
+            # Token revoked early - fetch a fresh one and retry once
+            snov_tokens.invalidate(api_key)
+            access_token = snov_tokens.get(api_key, lambda: self._request_snov_token(api_key, client_secret))
+            response = self.session.get(search_url, headers={"Authorization": f"Bearer {access_token}"}, params=params, timeout=30)
         response.raise_for_status()
         
         emails = response.json().get('emails', [])
@@ -301,6 +645,23 @@ class MultiProviderEmailFinder:
         
         return leads
     
+    def _request_snov_token(self, client_id: str, client_secret: str) -> Tuple[str, int]:
+        """Exchange Snov.io client credentials for an access token"""
+        auth_url = "https://api.snov.io/v1/oauth/access_token"
+        auth_data = {
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "grant_type": "client_credentials"
+        }
+        
+        auth_response = self.session.post(auth_url, data=auth_data, timeout=30)
+        auth_response.raise_for_status()
+        payload = auth_response.json()
+        access_token = payload.get('access_token')
+        if not access_token:
+            raise RuntimeError("Snov.io did not return an access token")
+        return access_token, payload.get('expires_in')
+    
     def _fetch_findthatlead(self, domain: str, domain_type: str, config: Dict) -> List[Lead]:
         """Fetch from FindThatLead"""
         api_key = config['api_key']
@@ -308,7 +669,7 @@ class MultiProviderEmailFinder:
         url = f"https://api.findthatlead.com/v1/domains/{domain}/emails"
         headers = {"Authorization": f"Bearer {api_key}"}
         
-        response = requests.get(url, headers=headers, timeout=30)
+        response = self.session.get(url, headers=headers, timeout=30)
         response.raise_for_status()
         
         data = response.json()
@@ -341,22 +702,44 @@ class MultiProviderEmailFinder:
             }
             
             # Get user's calls in last 24 hours
-            since = datetime.utcnow() - timedelta(hours=24)
-            calls_today = APICallLog.query.filter(
-                APICallLog.user_id == user.id,
-                APICallLog.provider == provider_name,
-                APICallLog.created_at >= since,
-                APICallLog.success == True
-            ).count()
+            calls_today = self.rate_limiter.count((user.id, provider_name))
             
             provider_status['calls_today'] = calls_today
-            provider_status['remaining_today'] = max(0, 10 - calls_today)
-            provider_status['rate_limited'] = calls_today >= 10
+            provider_status['remaining_today'] = max(0, DAILY_CALL_LIMIT - calls_today)
+            provider_status['rate_limited'] = calls_today >= DAILY_CALL_LIMIT
             
             status[provider_name] = provider_status
         
         return status
     
+    def warm_provider_stats(self, days: int = 7) -> int:
+        """Seed in-memory provider stats from recent timed APICallLog rows"""
+        since = datetime.utcnow() - timedelta(days=days)
+        rows = APICallLog.query.filter(
+            APICallLog.created_at >= since,
+            APICallLog.latency_ms.isnot(None)
+        ).order_by(APICallLog.created_at.desc()).limit(self.provider_stats.window * 20).all()
+        
+        def outcome(row):
+            if row.success:
+                return HIT
+            return EMPTY if row.lead_count == 0 else ERROR
+        
+        return self.provider_stats.warm(
+            (row.user_id, row.provider, row.latency_ms, outcome(row)) for row in reversed(rows)
+        )
+    
+    def get_stats(self) -> Dict:
+        """In-process finder statistics for this worker"""
+        return {
+            'memory_cache': self.memory_cache.stats(),
+            'single_flight': self.inflight.stats(),
+            'strategy': self.strategy,
+            'rate_limiter': self.rate_limiter.stats(),
+            'call_log_writer': self.call_log_writer.stats(),
+            'providers': self.provider_stats.snapshot(),
+        }
+    
     def get_enabled_providers(self, user: 'User') -> List[str]:
         """Get list of enabled provider names for a user"""
         providers = self.get_user_providers(user)
@@ -1,81 +1,259 @@
+import hashlib
+import json
+import re
+import threading
 from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 
 from .models import Lead, EmailDraft
-from .utils import clean_multiline
+from .openai_pool import OpenAIClientPool, openai_clients
+from .utils import AgentConfig, clean_multiline
 
 
 @dataclass
 class OpenAIDraftConfig:
     model: str
+    # Seconds allowed per completion request; a lead that runs over falls back to the template
+    timeout: float = 30.0
+    max_retries: int = 1
+    # Ask for subject and body in one JSON completion instead of two separate calls
+    single_call: bool = True
+
+    @classmethod
+    def from_agent_config(cls, config: AgentConfig) -> "OpenAIDraftConfig":
+        return cls(model=config.openai_model, timeout=config.draft_timeout, single_call=config.draft_single_call)
+
+
+USAGE_COUNTERS = (
+    "calls", "prompt_tokens", "completion_tokens", "drafts", "fallbacks", "calls_saved", "tokens_saved", "cache_hits",
+)
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+_SUBJECT_LINE = re.compile(r"^\s*subject:\s*(.+)$", re.IGNORECASE | re.MULTILINE)
+
+
+def response_cache_key(model: str, messages: List[Dict[str, str]], **options) -> str:
+    """Stable hash of everything that shapes a completion: model, prompt (lead fields included) and sampling options"""
+    payload = json.dumps({"model": model, "messages": messages, "options": options}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def parse_combined_draft(text: str) -> Tuple[Optional[str], Optional[str]]:
+    """Pull ``(subject, body)`` out of a combined completion; either may be None.
+
+    Accepts the requested JSON object, JSON wrapped in a code fence or prose,
+    and plain text with a leading "Subject:" line.
+    """
+    text = _FENCE.sub("", (text or "").strip())
+    if not text:
+        return None, None
+    candidates = [text]
+    start, end = text.find("{"), text.rfind("}")
+    if 0 <= start < end:
+        candidates.append(text[start:end + 1])
+    for candidate in candidates:
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            subject = str(data.get("subject") or "").strip() or None
+            body = str(data.get("body") or "").strip() or None
+            return subject, body
+    match = _SUBJECT_LINE.search(text)
+    if match:
+        body = (text[:match.start()] + text[match.end():]).strip()
+        return match.group(1).strip() or None, body or None
+    return None, text
+
+
+def sender_name_for(background_summary: str) -> str:
+    return background_summary.split(',')[0].strip() if background_summary else 'Anubhav'
+
+
+def draft_messages(lead: Lead, portfolio_url: str, background_summary: str, tone: str,
+                   resume_url: Optional[str] = None, single_call: bool = True) -> List[Dict[str, str]]:
+    """Chat messages asking for one lead's email: body only, or subject and body as JSON with ``single_call``"""
+    sender_name = sender_name_for(background_summary)
+    greeting_name = lead.first_name or "there"
+    
+    links = f"Portfolio: {portfolio_url}"
+    if resume_url:
+        links += f"\\nResume: {resume_url}"
+    
+    system_prompt = (
+        "You are writing a professional cold email for a PM job seeker reaching out to a product leader. "
+        "The email should be concise (under 120 words), genuine, and professional. "
+        "Focus: Expressing interest in PM opportunities at their company. "
+        "Do NOT mention: salary, resumes, urgency, or desperation. "
+    )
+    
+    user_prompt = (
+        f"Write a professional job-seeking email to {greeting_name}, {lead.role} at {lead.company}.\\n\\n"
+        f"About sender:\\n"
+        f"- Name: {sender_name}\\n"
+        f"- Background: BITS Goa graduate, currently working as PM\\n"
+        f"- Experience: Building AI-powered product analytics and decision-support tools\\n"
+        f"- Goal: Exploring PM opportunities at {lead.company}\\n\\n"
+        f"Email structure:\\n"
+        f"1. Brief intro (who you are, what you do)\\n"
+        f"2. Why {lead.company} (admiration for their work)\\n"
+        f"3. Ask: Insights on PM roles or product leadership\\n"
+        f"4. Close with links below\\n\\n"
+        f"Links to include at end:\\n{links}\\n\\n"
+        f"Tone: {tone}, confident but humble, job-seeking but not desperate.\\n"
+    )
+    if single_call:
+        system_prompt += (
+            'Return a JSON object with two string keys: "subject" (a subject line under 60 characters, '
+            'professional and genuine) and "body" (the email body as plain text, no markdown, no brackets).'
+        )
+        user_prompt += "IMPORTANT: Return ONLY the JSON object."
+    else:
+        system_prompt += "Return plain text only - no JSON, no markdown formatting, no brackets."
+        user_prompt += "IMPORTANT: Return ONLY the email body text. Do NOT include 'Subject:' line. No markdown formatting."
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def subject_messages(lead: Lead, sender_name: str) -> List[Dict[str, str]]:
+    """Chat messages for the separate subject-line call of a two-call draft"""
+    return [
+        {"role": "system", "content": "You write concise, professional email subject lines for job seekers. Keep it under 60 characters, professional, and intriguing."},
+        {"role": "user", "content": f"Write a subject line for a PM job seeker ({sender_name}) reaching out to {lead.role} at {lead.company}. Make it professional and genuine."}
+    ]
+
+
+def estimate_prompt_tokens(messages: List[Dict[str, str]]) -> int:
+    """Rough prompt token count without a tokenizer: ~4 characters per token plus chat framing"""
+    return sum(len(message["content"]) // 4 + 4 for message in messages) + 3
+
+
+def draft_options(single_call: bool = True) -> Dict[str, object]:
+    """Sampling options sent with ``draft_messages``"""
+    if single_call:
+        return {"temperature": 0.6, "max_tokens": 400, "response_format": {"type": "json_object"}}
+    return {"temperature": 0.6, "max_tokens": 350}
+
+
+def clean_draft_body(body: str) -> str:
+    # Remove any markdown formatting and subject line if included
+    body = body.replace('[', '').replace(']', '').replace('(', ' ').replace(')', '')
+    # Remove "Subject:" line if OpenAI added it
+    if body.startswith('Subject:'):
+        body = '\n'.join(body.split('\n')[1:]).strip()
+    # Remove any remaining "Subject: ..." patterns
+    body = re.sub(r'^Subject:.*?\n', '', body, flags=re.IGNORECASE | re.MULTILINE)
+    return clean_multiline(body)
+
+
+def draft_from_combined(text: str, background_summary: str) -> EmailDraft:
+    """EmailDraft from a single-call response; raises ValueError when it has no body"""
+    subject, body = parse_combined_draft(text)
+    if not body:
+        raise ValueError("Combined draft response had no body")
+    if subject:
+        subject = subject.replace('"', '').replace("'", '')
+    else:
+        subject = f"PM opportunity inquiry - {sender_name_for(background_summary)}"
+    return EmailDraft(subject=subject, body=clean_draft_body(body))
 
 
 class OpenAIDraftClient:
-    def __init__(self, api_key: str, config: OpenAIDraftConfig) -> None:
-        from openai import OpenAI
+    """Drafts emails with OpenAI chat completions.
 
-        self._client = OpenAI(api_key=api_key)
+    ``cache`` is optional: any object with ``get(key)`` returning the stored
+    text (or None) and ``set(key, model, text)``. Completions are looked up by
+    ``response_cache_key`` before calling OpenAI; with ``refresh`` the lookup is
+    skipped and fresh responses overwrite what was stored.
+
+    The SDK client comes from ``pool`` (the shared ``openai_clients`` by
+    default), so constructing one of these per request is cheap and reuses
+    the pooled connections for its API key.
+    """
+
+    def __init__(self, api_key: str, config: OpenAIDraftConfig, cache=None, refresh: bool = False,
+                 pool: Optional[OpenAIClientPool] = None) -> None:
+        self._client = (pool or openai_clients).get(api_key, config.timeout, config.max_retries)
         self._config = config
+        self._cache = cache
+        self._refresh = refresh
+        self._usage_lock = threading.Lock()
+        self._usage: Dict[str, int] = dict.fromkeys(USAGE_COUNTERS, 0)
+
+    def usage(self) -> Dict[str, int]:
+        """Completion calls and tokens spent by this client, plus calls and estimated tokens saved by single-call drafts"""
+        with self._usage_lock:
+            usage = dict(self._usage)
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        return usage
+
+    def _count(self, **amounts: int) -> None:
+        with self._usage_lock:
+            for name, amount in amounts.items():
+                self._usage[name] += amount
+
+    def _complete(self, messages: List[Dict[str, str]], **options) -> str:
+        return self._completion(messages, **options)[0]
+
+    def _completion(self, messages: List[Dict[str, str]], **options) -> Tuple[str, bool]:
+        """``(text, called)`` where ``called`` is False when the response came from the cache"""
+        key = response_cache_key(self._config.model, messages, **options) if self._cache is not None else None
+        if key and not self._refresh:
+            cached = self._cache_get(key)
+            if cached:
+                self._count(cache_hits=1)
+                return cached, False
+        response = self._client.chat.completions.create(model=self._config.model, messages=messages, **options)
+        usage = getattr(response, "usage", None)
+        self._count(
+            calls=1,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        )
+        text = response.choices[0].message.content.strip()
+        if key and text:
+            self._cache_set(key, text)
+        return text, True
+
+    # A cache outage must never cost a draft, so failures count as misses
+    def _cache_get(self, key: str) -> Optional[str]:
+        try:
+            return self._cache.get(key)
+        except Exception:
+            return None
+
+    def _cache_set(self, key: str, text: str) -> None:
+        try:
+            self._cache.set(key, self._config.model, text)
+        except Exception:
+            pass
 
     def generate_email(self, lead: Lead, portfolio_url: str, background_summary: str, tone: str,
                       custom_subject: str = None, resume_url: str = None) -> EmailDraft:
-        sender_name = background_summary.split(',')[0].strip() if background_summary else 'Anubhav'
-        greeting_name = lead.first_name or "there"
-        
-        # Generate custom subject if not provided
-        if not custom_subject:
-            custom_subject = self._generate_subject(lead, sender_name)
-        
-        links = f"Portfolio: {portfolio_url}"
-        if resume_url:
-            links += f"\\nResume: {resume_url}"
-        
-        system_prompt = (
-            "You are writing a professional cold email for a PM job seeker reaching out to a product leader. "
-            "The email should be concise (under 120 words), genuine, and professional. "
-            "Focus: Expressing interest in PM opportunities at their company. "
-            "Do NOT mention: salary, resumes, urgency, or desperation. "
-            "Return plain text only - no JSON, no markdown formatting, no brackets."
-        )
-        
-        user_prompt = (
-            f"Write a professional job-seeking email to {greeting_name}, {lead.role} at {lead.company}.\\n\\n"
-            f"About sender:\\n"
-            f"- Name: {sender_name}\\n"
-            f"- Background: BITS Goa graduate, currently working as PM\\n"
-            f"- Experience: Building AI-powered product analytics and decision-support tools\\n"
-            f"- Goal: Exploring PM opportunities at {lead.company}\\n\\n"
-            f"Email structure:\\n"
-            f"1. Brief intro (who you are, what you do)\\n"
-            f"2. Why {lead.company} (admiration for their work)\\n"
-            f"3. Ask: Insights on PM roles or product leadership\\n"
-            f"4. Close with links below\\n\\n"
-            f"Links to include at end:\\n{links}\\n\\n"
-            f"Tone: {tone}, confident but humble, job-seeking but not desperate.\\n"
-            f"IMPORTANT: Return ONLY the email body text. Do NOT include 'Subject:' line. No markdown formatting."
-        )
-        
+        single_call = self._config.single_call and not custom_subject
+        messages = draft_messages(lead, portfolio_url, background_summary, tone, resume_url, single_call)
         try:
-            response = self._client.chat.completions.create(
-                model=self._config.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.6,
-                max_tokens=350,
-            )
-            body = response.choices[0].message.content.strip()
-            # Remove any markdown formatting and subject line if included
-            body = body.replace('[', '').replace(']', '').replace('(', ' ').replace(')', '')
-            # Remove "Subject:" line if OpenAI added it
-            if body.startswith('Subject:'):
-                body = '\n'.join(body.split('\n')[1:]).strip()
-            # Remove any remaining "Subject: ..." patterns
-            import re
-            body = re.sub(r'^Subject:.*?\n', '', body, flags=re.IGNORECASE | re.MULTILINE)
-            return EmailDraft(subject=custom_subject, body=clean_multiline(body))
+            if single_call:
+                # One completion for both parts; the separate subject call is skipped
+                text, called = self._completion(messages, **draft_options(True))
+                draft = draft_from_combined(text, background_summary)
+                if called:
+                    # A cache hit made no calls, so there is no subject call it stood in for
+                    skipped = subject_messages(lead, sender_name_for(background_summary))
+                    self._count(calls_saved=1, tokens_saved=estimate_prompt_tokens(skipped))
+            else:
+                # Generate custom subject if not provided
+                if not custom_subject:
+                    custom_subject = self._generate_subject(lead, sender_name_for(background_summary))
+                body = self._complete(messages, **draft_options(False))
+                draft = EmailDraft(subject=custom_subject, body=clean_draft_body(body))
+            self._count(drafts=1)
+            return draft
         except Exception:
             # Fallback to template if OpenAI fails
+            self._count(fallbacks=1)
             from .email_generator import build_subject, build_body
             subject = build_subject(lead, custom_subject)
             body = build_body(lead, portfolio_url, background_summary, tone, resume_url)
@@ -84,16 +262,7 @@ class OpenAIDraftClient:
     def _generate_subject(self, lead: Lead, sender_name: str) -> str:
         """Generate a personalized email subject using OpenAI"""
         try:
-            response = self._client.chat.completions.create(
-                model=self._config.model,
-                messages=[
-                    {"role": "system", "content": "You write concise, professional email subject lines for job seekers. Keep it under 60 characters, professional, and intriguing."},
-                    {"role": "user", "content": f"Write a subject line for a PM job seeker ({sender_name}) reaching out to {lead.role} at {lead.company}. Make it professional and genuine."}
-                ],
-                temperature=0.7,
-                max_tokens=20,
-            )
-            subject = response.choices[0].message.content.strip()
+            subject = self._complete(subject_messages(lead, sender_name), temperature=0.7, max_tokens=20)
             # Remove quotes if OpenAI adds them
             subject = subject.replace('"', '').replace("'", '')
             return subject
@@ -0,0 +1,124 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# Distinct API keys (per user, plus the server key) kept with a warm connection pool.
+DEFAULT_MAX_CLIENTS = int(os.getenv("OPENAI_POOL_SIZE", "32"))
+# Clients unused for this long are dropped on the next lookup.
+DEFAULT_IDLE_SECONDS = float(os.getenv("OPENAI_POOL_IDLE_SECONDS", "900"))
+
+
+def _build_client(api_key: str, timeout: Optional[float], max_retries: Optional[int]) -> Any:
+    from openai import OpenAI
+
+    options: Dict[str, Any] = {}
+    if timeout is not None:
+        options["timeout"] = timeout
+    if max_retries is not None:
+        options["max_retries"] = max_retries
+    return OpenAI(api_key=api_key, **options)
+
+
+@dataclass
+class _PooledClient:
+    client: Any
+    last_used: float
+
+
+class OpenAIClientPool:
+    """Thread-safe, bounded cache of OpenAI SDK clients keyed by API key and request options.
+
+    Each SDK client owns an HTTP connection pool, so sharing one per key lets
+    requests reuse open connections to the API instead of building a client
+    and handshaking on every call. Past ``max_clients`` the least recently used
+    client is dropped; so is any client idle for ``idle_seconds``. Dropped
+    clients are not closed here, because another thread may still be mid-request;
+    the SDK closes their connections once the last reference goes away.
+    """
+
+    def __init__(
+        self,
+        max_clients: int = DEFAULT_MAX_CLIENTS,
+        idle_seconds: float = DEFAULT_IDLE_SECONDS,
+        factory: Callable[[str, Optional[float], Optional[int]], Any] = _build_client,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._factory = factory
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._clients: "OrderedDict[Tuple[str, Optional[float], Optional[int]], _PooledClient]" = OrderedDict()
+        self.configure(max_clients, idle_seconds)
+        self.created = 0
+        self.hits = 0
+        self.evicted = 0
+
+    def configure(self, max_clients: int, idle_seconds: float) -> None:
+        with self._lock:
+            self.max_clients = max(1, int(max_clients))
+            self.idle_seconds = float(idle_seconds)
+
+    def get(self, api_key: str, timeout: Optional[float] = None, max_retries: Optional[int] = None) -> Any:
+        # Keys are hashed so the pool never holds them as lookup keys or shows them in stats
+        key = (hashlib.sha256(api_key.encode("utf-8")).hexdigest(), timeout, max_retries)
+        now = self._clock()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                entry.last_used = now
+                self._clients.move_to_end(key)
+                self.hits += 1
+                return entry.client
+
+        client = self._factory(api_key, timeout, max_retries)
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is None:
+                # Another thread may have built one meanwhile; the first one stored wins
+                entry = self._clients[key] = _PooledClient(client=client, last_used=now)
+                self.created += 1
+                while len(self._clients) > self.max_clients:
+                    self._clients.popitem(last=False)
+                    self.evicted += 1
+            else:
+                entry.last_used = now
+                self._clients.move_to_end(key)
+            return entry.client
+
+    def _evict_idle(self, now: float) -> None:
+        if self.idle_seconds <= 0:
+            return
+        while self._clients:
+            key, entry = next(iter(self._clients.items()))
+            if now - entry.last_used < self.idle_seconds:
+                break
+            del self._clients[key]
+            self.evicted += 1
+
+    def close(self) -> None:
+        """Close and forget every pooled client"""
+        with self._lock:
+            entries = list(self._clients.values())
+            self._clients.clear()
+        for entry in entries:
+            close = getattr(entry.client, "close", None)
+            if close is not None:
+                close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "created": self.created,
+                "hits": self.hits,
+                "evicted": self.evicted,
+            }
+
+
+# Shared by every draft generator in this process
+openai_clients = OpenAIClientPool()
@@ -0,0 +1,107 @@
+import threading
+from collections import defaultdict, deque
+from typing import Deque, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+HIT = "hit"
+EMPTY = "empty"
+ERROR = "error"
+
+DEFAULT_WINDOW = 200
+# Below this many samples a user's own history is too thin; fall back to everyone's.
+MIN_USER_SAMPLES = 5
+# Assumed for providers with no history, so they still get tried and measured.
+PRIOR_LATENCY_MS = 1500.0
+
+
+def _percentile(sorted_values, fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class ProviderStats:
+    """Rolling per-provider call outcomes and latencies, globally and per user.
+
+    ``rank`` orders a fallback chain to minimise expected time to the first
+    lead: trying providers in ascending ``cost / p_hit`` order is optimal for a
+    sequence of independent attempts, where cost blends p50 and p95 latency and
+    p_hit is a smoothed hit rate.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[Tuple[Hashable, str], Deque[Tuple[float, str]]] = defaultdict(
+            lambda: deque(maxlen=self.window)
+        )
+
+    def record(self, provider: str, latency_ms: float, outcome: str, user_id: Optional[int] = None) -> None:
+        sample = (float(latency_ms), outcome)
+        with self._lock:
+            self._samples[(None, provider)].append(sample)
+            if user_id is not None:
+                self._samples[(user_id, provider)].append(sample)
+
+    def summary(self, provider: str, user_id: Optional[int] = None) -> Dict:
+        with self._lock:
+            samples = list(self._samples.get((user_id, provider), ()))
+        count = len(samples)
+        latencies = sorted(latency for latency, _ in samples)
+        outcomes = [outcome for _, outcome in samples]
+        return {
+            "calls": count,
+            "hit_rate": round(outcomes.count(HIT) / count, 4) if count else None,
+            "empty_rate": round(outcomes.count(EMPTY) / count, 4) if count else None,
+            "error_rate": round(outcomes.count(ERROR) / count, 4) if count else None,
+            "p50_ms": _percentile(latencies, 0.50),
+            "p95_ms": _percentile(latencies, 0.95),
+        }
+
+    def warm(self, rows: Iterable[Tuple[Optional[int], str, float, str]]) -> int:
+        """Seed from historical ``(user_id, provider, latency_ms, outcome)`` rows, oldest first."""
+        count = 0
+        for user_id, provider, latency_ms, outcome in rows:
+            self.record(provider, latency_ms, outcome, user_id=user_id)
+            count += 1
+        return count
+
+    def _samples_for(self, provider: str, user_id: Optional[int]) -> List[Tuple[float, str]]:
+        with self._lock:
+            if user_id is not None:
+                own = self._samples.get((user_id, provider))
+                if own and len(own) >= MIN_USER_SAMPLES:
+                    return list(own)
+            return list(self._samples.get((None, provider), ()))
+
+    def hit_probability(self, provider: str, user_id: Optional[int] = None) -> float:
+        """Smoothed chance that a call returns leads (0.5 with no history)."""
+        samples = self._samples_for(provider, user_id)
+        hits = sum(1 for _, outcome in samples if outcome == HIT)
+        # Laplace smoothing keeps one bad streak from exiling a provider forever
+        return (hits + 1) / (len(samples) + 2)
+
+    def expected_cost(self, provider: str, user_id: Optional[int] = None) -> float:
+        """Expected milliseconds spent on this provider per lead-yielding call."""
+        samples = self._samples_for(provider, user_id)
+        if not samples:
+            return PRIOR_LATENCY_MS / 0.5
+        latencies = sorted(latency for latency, _ in samples)
+        latency = 0.5 * _percentile(latencies, 0.50) + 0.5 * _percentile(latencies, 0.95)
+        return max(latency, 1.0) / self.hit_probability(provider, user_id)
+
+    def rank(self, providers: Iterable[str], user_id: Optional[int] = None) -> List[str]:
+        """Providers ordered by expected time to first lead; ties keep the given order."""
+        providers = list(providers)
+        return sorted(providers, key=lambda name: self.expected_cost(name, user_id))
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            providers = sorted({provider for user_id, provider in self._samples if user_id is None})
+        snapshot = {}
+        for provider in providers:
+            summary = self.summary(provider)
+            summary["expected_cost_ms"] = round(self.expected_cost(provider), 1)
+            snapshot[provider] = summary
+        return snapshot
@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Hashable, Iterable, Optional, Tuple
+
+
+class SlidingWindowLimiter:
+    """In-process sliding-window counter: at most ``limit`` hits per ``window_seconds`` per key.
+
+    Each key keeps only its newest ``limit`` timestamps, so a check is O(limit)
+    with no database round trip. Counters live in this process only; an optional
+    ``loader(key) -> timestamps`` re-reads a key from the source of truth every
+    ``resync_seconds`` so hits recorded by other workers are picked up.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        window_seconds: float,
+        loader: Optional[Callable[[Hashable], Iterable[float]]] = None,
+        resync_seconds: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.limit = int(limit)
+        self.window_seconds = float(window_seconds)
+        self.loader = loader
+        self.resync_seconds = float(resync_seconds)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._hits: Dict[Hashable, Deque[float]] = {}
+        self._synced_at: Dict[Hashable, float] = {}
+        # A full warm-up also vouches for keys that had no hits at the time
+        self._warmed_at: Optional[float] = None
+        self.resyncs = 0
+
+    def _window(self, key: Hashable) -> Deque[float]:
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = self._hits[key] = deque(maxlen=self.limit)
+        return hits
+
+    def _prune(self, hits: Deque[float], now: float) -> None:
+        cutoff = now - self.window_seconds
+        while hits and hits[0] <= cutoff:
+            hits.popleft()
+
+    def hit(self, key: Hashable, at: Optional[float] = None) -> None:
+        at = self._clock() if at is None else at
+        with self._lock:
+            self._window(key).append(at)
+
+    def warm(self, entries: Iterable[Tuple[Hashable, float]]) -> int:
+        """Load ``(key, timestamp)`` pairs, e.g. recent successful calls, and mark those keys synced."""
+        now = self._clock()
+        grouped: Dict[Hashable, list] = {}
+        for key, at in entries:
+            grouped.setdefault(key, []).append(at)
+        with self._lock:
+            for key, stamps in grouped.items():
+                hits = self._window(key)
+                ordered = sorted([*hits, *stamps])[-self.limit:]
+                hits.clear()
+                hits.extend(ordered)
+                self._synced_at[key] = now
+            self._warmed_at = now
+        return sum(len(stamps) for stamps in grouped.values())
+
+    def _maybe_resync(self, key: Hashable, now: float) -> None:
+        if self.loader is None:
+            return
+        with self._lock:
+            synced_at = self._synced_at.get(key, self._warmed_at)
+            if synced_at is not None and now - synced_at < self.resync_seconds:
+                return
+            self._synced_at[key] = now
+        stamps = sorted(self.loader(key))[-self.limit:]
+        with self._lock:
+            hits = self._window(key)
+            self._prune(hits, now)
+            fresh = [at for at in stamps if at > now - self.window_seconds]
+            # Both views under-count the truth; the larger one is the safer bound.
+            if len(fresh) > len(hits):
+                hits.clear()
+                hits.extend(fresh)
+            self.resyncs += 1
+
+    def count(self, key: Hashable) -> int:
+        now = self._clock()
+        self._maybe_resync(key, now)
+        with self._lock:
+            hits = self._hits.get(key)
+            if not hits:
+                return 0
+            self._prune(hits, now)
+            return len(hits)
+
+    def allowed(self, key: Hashable) -> bool:
+        return self.count(key) < self.limit
+
+    def remaining(self, key: Hashable) -> int:
+        return max(0, self.limit - self.count(key))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "keys": len(self._hits),
+                "limit": self.limit,
+                "window_seconds": int(self.window_seconds),
+                "resyncs": self.resyncs,
+            }
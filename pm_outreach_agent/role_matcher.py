@@ -0,0 +1,117 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Sequence, Tuple
+
+from .utils import normalize_role
+
+
+TARGET = 1
+EXCLUDED = 2
+# Distinct role strings remembered per matcher; titles repeat heavily across leads.
+MEMO_SIZE = 20000
+
+
+class RoleMatcher:
+    """Classify a role against target, excluded and seniority phrases in one regex pass.
+
+    Matching is case-insensitive substring containment, the same rule as
+    ``utils.contains_role``. All phrases go into one lookahead alternation,
+    longest first, so every position reports its longest phrase. Each phrase's
+    flags and priority already include those of every phrase it contains, so
+    the union over positions equals checking each phrase separately. Results
+    are memoised per raw role string.
+
+    With ``whole_words`` a phrase only counts when it is not embedded in a
+    longer word, so a short title like "cto" does not match "director".
+    """
+
+    def __init__(
+        self,
+        target_roles: Sequence[str],
+        excluded_roles: Sequence[str],
+        seniority: Sequence[str] = (),
+        whole_words: bool = False,
+    ) -> None:
+        flags: Dict[str, int] = {}
+        priority: Dict[str, int] = {}
+        # A blank phrase is contained in every role, as it is for contains_role.
+        self._always: Tuple[int, int] = (0, 0)
+        for bit, roles in ((TARGET, target_roles), (EXCLUDED, excluded_roles)):
+            for raw in roles:
+                phrase = normalize_role(raw) if raw else ""
+                if phrase:
+                    flags[phrase] = flags.get(phrase, 0) | bit
+                elif raw:
+                    self._always = (self._always[0] | bit, self._always[1])
+        for idx, phrase in enumerate(map(normalize_role, seniority)):
+            score = len(seniority) - idx
+            if phrase:
+                flags.setdefault(phrase, 0)
+                priority[phrase] = max(priority.get(phrase, 0), score)
+            else:
+                self._always = (self._always[0], max(self._always[1], score))
+
+        left, right = (r"(?<!\w)", r"(?!\w)") if whole_words else ("", "")
+        phrases = sorted(flags, key=len, reverse=True)
+        self._info: Dict[str, Tuple[int, int]] = {}
+        for phrase in phrases:
+            mask, best = 0, 0
+            for other in phrases:
+                contained = re.search(left + re.escape(other) + right, phrase) if whole_words else other in phrase
+                if contained:
+                    mask |= flags[other]
+                    best = max(best, priority.get(other, 0))
+            self._info[phrase] = (mask, best)
+
+        self._pattern = (
+            re.compile("(?=" + left + "(" + "|".join(map(re.escape, phrases)) + ")" + right + ")") if phrases else None
+        )
+        self._memo: Dict[str, Tuple[int, int]] = {}
+
+    def classify(self, role: str) -> Tuple[int, int]:
+        """Return ``(flags, priority)``: TARGET/EXCLUDED bits and the best seniority score."""
+        result = self._memo.get(role)
+        if result is None:
+            result = self._classify(role)
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[role] = result
+        return result
+
+    def _classify(self, role: str) -> Tuple[int, int]:
+        mask, best = self._always
+        if self._pattern is None or not role:
+            return mask, best
+        info = self._info
+        for match in self._pattern.finditer(role.lower()):
+            phrase_mask, phrase_priority = info[match.group(1)]
+            mask |= phrase_mask
+            if phrase_priority > best:
+                best = phrase_priority
+        return mask, best
+
+    def is_target(self, role: str) -> bool:
+        return bool(self.classify(role)[0] & TARGET)
+
+    def is_excluded(self, role: str) -> bool:
+        return bool(self.classify(role)[0] & EXCLUDED)
+
+    def priority(self, role: str) -> int:
+        return self.classify(role)[1]
+
+
+@lru_cache(maxsize=64)
+def _cached_matcher(
+    target_roles: Tuple[str, ...], excluded_roles: Tuple[str, ...], seniority: Tuple[str, ...], whole_words: bool
+) -> RoleMatcher:
+    return RoleMatcher(target_roles, excluded_roles, seniority, whole_words)
+
+
+def get_role_matcher(
+    target_roles: Iterable[str] = (),
+    excluded_roles: Iterable[str] = (),
+    seniority: Iterable[str] = (),
+    whole_words: bool = False,
+) -> RoleMatcher:
+    """Shared matcher for this combination of role lists, compiled on first use."""
+    return _cached_matcher(tuple(target_roles or ()), tuple(excluded_roles or ()), tuple(seniority or ()), whole_words)
@@ -0,0 +1,76 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Tuple
+
+
+DEFAULT_TOKEN_TTL_SECONDS = 3600
+DEFAULT_REFRESH_MARGIN_SECONDS = 60
+
+
+@dataclass
+class _CachedToken:
+    token: str
+    expires_at: float
+
+
+class AccessTokenCache:
+    """Thread-safe cache of OAuth client-credentials tokens keyed by client id.
+
+    Tokens are refreshed ``refresh_margin`` seconds before they expire. Only one
+    thread per client id talks to the token endpoint; while a refresh is in
+    flight the others keep using the still-valid token, or wait for the new one
+    if there is none.
+    """
+
+    def __init__(
+        self,
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN_SECONDS,
+        default_ttl: float = DEFAULT_TOKEN_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.refresh_margin = refresh_margin
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._tokens: Dict[str, _CachedToken] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self.fetches = 0
+        self.hits = 0
+
+    def _lock_for(self, client_id: str) -> threading.Lock:
+        with self._guard:
+            lock = self._locks.get(client_id)
+            if lock is None:
+                lock = self._locks[client_id] = threading.Lock()
+            return lock
+
+    def get(self, client_id: str, fetch: Callable[[], Tuple[str, float]]) -> str:
+        """Return a valid token, calling ``fetch() -> (token, expires_in)`` when needed."""
+        now = self._clock()
+        cached = self._tokens.get(client_id)
+        if cached and now < cached.expires_at - self.refresh_margin:
+            self.hits += 1
+            return cached.token
+
+        lock = self._lock_for(client_id)
+        still_valid = cached is not None and now < cached.expires_at
+        if not lock.acquire(blocking=not still_valid):
+            # Someone else is refreshing and the current token has not expired yet.
+            self.hits += 1
+            return cached.token
+        try:
+            cached = self._tokens.get(client_id)
+            if cached and self._clock() < cached.expires_at - self.refresh_margin:
+                self.hits += 1
+                return cached.token
+            token, expires_in = fetch()
+            ttl = float(expires_in or self.default_ttl)
+            self._tokens[client_id] = _CachedToken(token=token, expires_at=self._clock() + ttl)
+            self.fetches += 1
+            return token
+        finally:
+            lock.release()
+
+    def invalidate(self, client_id: str) -> None:
+        self._tokens.pop(client_id, None)
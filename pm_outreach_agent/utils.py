@@ -1,7 +1,7 @@
 import csv
 import os
 from dataclasses import dataclass
-from typing import Iterable, List, Dict, Any
+from typing import Iterable, List, Dict, Any, Optional, Tuple
 
 import yaml
 
@@ -23,6 +23,26 @@ class AgentConfig:
     gmail_credentials_path: str
     gmail_token_path: str
     domains: Dict[str, Any] = None
+    discovery_workers: int = 8
+    provider_concurrency: Dict[str, int] = None
+    draft_workers: int = 4
+    draft_timeout: float = 30.0
+    draft_single_call: bool = True
+    draft_reuse: str = "lead"
+    # Per-profile seniority, most senior first, from domains.<profile>.target_roles
+    seniority_tables: Dict[str, Tuple[str, ...]] = None
+
+    def seniority_for(self, profile: Optional[str]) -> Optional[Tuple[str, ...]]:
+        return (self.seniority_tables or {}).get(profile)
+
+
+def build_seniority_tables(domains: Dict[str, Any]) -> Dict[str, Tuple[str, ...]]:
+    tables: Dict[str, Tuple[str, ...]] = {}
+    for profile, settings in (domains or {}).items():
+        roles = tuple(normalize_role(str(role)) for role in (settings or {}).get("target_roles", []) if str(role).strip())
+        if roles:
+            tables[profile] = roles
+    return tables
 
 
 def load_config(path: str) -> AgentConfig:
@@ -41,7 +61,16 @@ def load_config(path: str) -> AgentConfig:
         use_gmail_drafts=bool(raw.get("use_gmail_drafts", False)),
         gmail_credentials_path=str(raw.get("gmail_credentials_path", "credentials.json")).strip(),
         gmail_token_path=str(raw.get("gmail_token_path", "token.json")).strip(),
-        domains=raw.get("domains", {})
+        domains=raw.get("domains", {}),
+        discovery_workers=int(raw.get("discovery_workers", 8)),
+        provider_concurrency={
+            str(name).strip(): int(cap) for name, cap in (raw.get("provider_concurrency") or {}).items()
+        },
+        draft_workers=int(raw.get("draft_workers", 4)),
+        draft_timeout=float(raw.get("draft_timeout", 30.0)),
+        draft_single_call=bool(raw.get("draft_single_call", True)),
+        draft_reuse=str(raw.get("draft_reuse", "lead")).strip(),
+        seniority_tables=build_seniority_tables(raw.get("domains") or {}),
     )
 
 
@@ -0,0 +1,94 @@
+import heapq
+from typing import List, Optional, Sequence, Tuple
+
+from .lead_filter import seniority_matcher
+from .models import LeadBatch
+from .role_matcher import EXCLUDED, TARGET, get_role_matcher
+
+try:
+    import numpy as np
+except ImportError:  # optional: the pure-Python path below is used instead
+    np = None
+
+
+HAS_NUMPY = np is not None
+
+
+def _role_tables(
+    batch: LeadBatch,
+    target_roles: List[str],
+    excluded_roles: List[str],
+    seniority: Optional[Sequence[str]],
+) -> Tuple[List[bool], List[int]]:
+    """Per role code: does the title pass the role filter, and its seniority score."""
+    classify = get_role_matcher(target_roles, excluded_roles).classify
+    rank_classify = seniority_matcher(seniority).classify
+    require_target = bool(target_roles)
+    allowed: List[bool] = []
+    priority: List[int] = []
+    for role in batch.role_values:
+        flags = classify(role)[0]
+        allowed.append(not flags & EXCLUDED and (not require_target or bool(flags & TARGET)))
+        priority.append(rank_classify(role)[1])
+    return allowed, priority
+
+
+def rank_batch_indices(
+    batch: LeadBatch,
+    target_roles: List[str],
+    excluded_roles: List[str],
+    min_confidence: int,
+    seniority: Optional[Sequence[str]] = None,
+    k: Optional[int] = None,
+    use_numpy: Optional[bool] = None,
+) -> List[int]:
+    """Row indices of ``batch`` that pass ``filter_leads``, in ``rank_leads`` order (first ``k`` if given).
+
+    Uses NumPy when it is installed (or when ``use_numpy`` is True), otherwise
+    plain Python; both give identical results, ties keeping row order.
+    """
+    if use_numpy is None:
+        use_numpy = HAS_NUMPY
+    if use_numpy and not HAS_NUMPY:
+        raise RuntimeError("NumPy is not installed. Install numpy or use use_numpy=False.")
+    if (k is not None and k <= 0) or not len(batch):
+        return []
+    allowed, priority = _role_tables(batch, target_roles, excluded_roles, seniority)
+    if use_numpy:
+        return _rank_numpy(batch, allowed, priority, min_confidence, k)
+    return _rank_python(batch, allowed, priority, min_confidence, k)
+
+
+def _rank_python(batch: LeadBatch, allowed: List[bool], priority: List[int], min_confidence: int,
+                 k: Optional[int]) -> List[int]:
+    confidences = batch.confidences
+    keep = [
+        index for index, code in enumerate(batch.role_codes)
+        if allowed[code] and confidences[index] >= min_confidence
+    ]
+    codes = batch.role_codes
+    scores = {index: priority[codes[index]] * 100 + confidences[index] for index in keep}
+    if k is None:
+        return sorted(keep, key=scores.__getitem__, reverse=True)
+    return heapq.nlargest(k, keep, key=scores.__getitem__)
+
+
+def _rank_numpy(batch: LeadBatch, allowed: List[bool], priority: List[int], min_confidence: int,
+                k: Optional[int]) -> List[int]:
+    # The batch's role codes index straight into the per-title tables; no strings are touched
+    codes = np.frombuffer(batch.role_codes, dtype=np.intc)
+    confidences = np.frombuffer(batch.confidences, dtype=np.intc).astype(np.int64)
+    allowed_by_code = np.asarray(allowed, dtype=bool)
+    priority_by_code = np.asarray(priority, dtype=np.int64)
+
+    mask = allowed_by_code[codes] & (confidences >= min_confidence)
+    rows = np.flatnonzero(mask)
+    scores = priority_by_code[codes[rows]] * 100 + confidences[rows]
+
+    if k is not None and k < len(rows):
+        # Fold row order into the key so the partition keeps ties exactly as a stable sort would
+        keys = scores * len(batch) + (len(batch) - 1 - rows)
+        top = np.argpartition(-keys, k - 1)[:k]
+        return rows[top[np.argsort(-keys[top])]].tolist()
+    order = np.argsort(-scores, kind="stable")
+    return rows[order].tolist()
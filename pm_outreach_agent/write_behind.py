@@ -0,0 +1,149 @@
+import atexit
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+
+_STOP = object()
+
+
+class _FlushRequest:
+    """Queued by flush(); the writer sets ``done`` once everything ahead of it is written"""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+class WriteBehindQueue:
+    """Buffer records and hand them to ``flush(records)`` in batches from a daemon thread.
+
+    A batch is written when ``max_batch`` records are waiting or ``flush_interval``
+    seconds after the oldest one arrived, whichever comes first. Anything still
+    buffered is written at interpreter exit, and ``flush`` writes it on demand.
+    ``put`` never blocks on the writer unless ``max_pending`` records are
+    already queued.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[Any]], None],
+        max_batch: int = 50,
+        flush_interval: float = 2.0,
+        max_pending: int = 10000,
+        name: str = "write-behind",
+    ) -> None:
+        self._flush = flush
+        self.max_batch = max(1, int(max_batch))
+        self.flush_interval = float(flush_interval)
+        self.name = name
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_pending)
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+
+    def put(self, record: Any) -> None:
+        self._ensure_started()
+        self._queue.put(record)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is _STOP:
+                return
+            if isinstance(record, _FlushRequest):
+                record.done.set()
+                continue
+            batch = [record]
+            stopping = False
+            flushed = None
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    record = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    stopping = True
+                    break
+                if isinstance(record, _FlushRequest):
+                    # Write the batch in hand now instead of at the deadline
+                    flushed = record
+                    break
+                batch.append(record)
+            self._write(batch)
+            if flushed is not None:
+                flushed.done.set()
+            if stopping:
+                return
+
+    def _write(self, batch: List[Any]) -> None:
+        with self._flush_lock:
+            try:
+                self._flush(batch)
+                self.written += len(batch)
+                self.batches += 1
+            except Exception as e:
+                self.failed += len(batch)
+                print(f"❌ {self.name}: failed to write {len(batch)} records: {e}")
+
+    def flush(self, timeout: float = 10.0) -> int:
+        """Write everything put so far, including the writer thread's current batch.
+
+        Waits up to ``timeout`` seconds for the writer; returns records written meanwhile.
+        """
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return self._drain()
+        written = self.written
+        request = _FlushRequest()
+        self._queue.put(request)
+        request.done.wait(timeout)
+        return self.written - written
+
+    def _drain(self) -> int:
+        """Write whatever is left in the queue on the calling thread, once the writer is gone"""
+        batch = []
+        while True:
+            try:
+                record = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(record, _FlushRequest):
+                record.done.set()
+            elif record is not _STOP:
+                batch.append(record)
+        for start in range(0, len(batch), self.max_batch):
+            self._write(batch[start:start + self.max_batch])
+        return len(batch)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the writer thread after it writes its current batch, then flush the rest"""
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+        self._drain()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "failed": self.failed,
+        }
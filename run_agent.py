@@ -1,16 +1,18 @@
 import argparse
-from typing import List
+from typing import List, Tuple
 from dotenv import load_dotenv
 
 from pm_outreach_agent.hunter_client import HunterClient
-from pm_outreach_agent.lead_filter import filter_leads, rank_leads
+from pm_outreach_agent.lead_filter import filter_leads, iter_filtered_leads, rank_leads, rank_top_leads
 from pm_outreach_agent.email_generator import generate_emails
 from pm_outreach_agent.output_writer import write_markdown, write_csv, format_summary
-from pm_outreach_agent.models import CompanyInput, Lead
+from pm_outreach_agent.models import CompanyInput, Lead, RankedLead
 from pm_outreach_agent.utils import load_config, read_companies_csv, require_env, log_action, normalize_domain
 from pm_outreach_agent.openai_client import OpenAIDraftClient, OpenAIDraftConfig
 from pm_outreach_agent.draft_writer import write_eml_drafts
 from pm_outreach_agent.gmail_client import create_gmail_drafts
+from pm_outreach_agent.discovery import ProviderSlots, discover_leads
+from pm_outreach_agent.batch_drafts import LocalBatchBackend, OpenAIBatchBackend, run_batch_drafts
 
 
 def parse_args() -> argparse.Namespace:
@@ -21,6 +23,16 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--config", type=str, required=True, help="Path to config.yaml")
     parser.add_argument("--write-drafts", action="store_true", help="Write local .eml drafts (no sending)")
     parser.add_argument("--gmail-drafts", action="store_true", help="Create Gmail drafts (no sending)")
+    parser.add_argument("--workers", type=int, help="Number of domains to search concurrently (overrides config)")
+    parser.add_argument("--top-k", type=int, help="Only rank and draft the best K leads (streams instead of sorting all)")
+    parser.add_argument("--batch-drafts", action="store_true",
+                        help="Draft all leads as one offline OpenAI Batch API job and wait for it (slower, cheaper)")
+    parser.add_argument("--batch-backend", choices=["openai", "local"], default="openai",
+                        help="Batch job runner; 'local' is a file-based stand-in that falls back to templates")
+    parser.add_argument("--batch-dir", type=str, default="batch_jobs", help="Where batch job JSONL files are written")
+    parser.add_argument("--batch-poll-seconds", type=float, default=30.0, help="Seconds between batch status checks")
+    parser.add_argument("--batch-max-wait-hours", type=float, default=24.0,
+                        help="Stop waiting after this long and use template drafts for unfinished leads")
     return parser.parse_args()
 
 
@@ -49,6 +61,20 @@ def dedupe_leads(leads: List[Lead]) -> List[Lead]:
     return unique
 
 
+def select_top_leads(leads: List[Lead], config, k: int) -> Tuple[int, List[RankedLead]]:
+    """Stream leads through the filter into a top-K heap; returns (filtered count, top K)."""
+    filtered = 0
+
+    def counted():
+        nonlocal filtered
+        for lead in iter_filtered_leads(leads, config.target_roles, config.excluded_roles, config.min_email_confidence):
+            filtered += 1
+            yield lead
+
+    top = rank_top_leads(counted(), k)
+    return filtered, top
+
+
 def main() -> None:
     load_dotenv()
     args = parse_args()
@@ -58,36 +84,77 @@ def main() -> None:
 
     client = HunterClient(api_key=api_key)
     openai_client = None
-    if config.use_openai_drafts:
+    if config.use_openai_drafts and not args.batch_drafts:
         openai_key = require_env("OPENAI_API_KEY")
-        openai_client = OpenAIDraftClient(openai_key, OpenAIDraftConfig(model=config.openai_model))
+        openai_client = OpenAIDraftClient(openai_key, OpenAIDraftConfig.from_agent_config(config))
+
+    slots = ProviderSlots(config.provider_concurrency)
+
+    def fetch(company: CompanyInput) -> List[Lead]:
+        with slots.hold("hunter"):
+            log_action(f"Searching domain {company.domain}")
+            return client.domain_search(company.domain)
 
     all_leads: List[Lead] = []
-    for company in companies:
-        log_action(f"Searching domain {company.domain}")
-        try:
-            leads = client.domain_search(company.domain)
-        except Exception as exc:
-            log_action(f"Hunter API error for {company.domain}: {exc}")
+    workers = args.workers or config.discovery_workers
+    for result in discover_leads(companies, fetch, max_workers=workers):
+        if result.error is not None:
+            log_action(f"Hunter API error for {result.company.domain}: {result.error}")
             continue
-        for lead in leads:
+        for lead in result.leads:
             if not lead.company:
-                lead.company = company.name
-        all_leads.extend(leads)
+                lead.company = result.company.name
+        all_leads.extend(result.leads)
 
     total_leads = len(all_leads)
     all_leads = dedupe_leads(all_leads)
-    filtered = filter_leads(all_leads, config.target_roles, config.excluded_roles, config.min_email_confidence)
-    ranked = rank_leads(filtered)
+    if args.top_k:
+        filtered_count, ranked = select_top_leads(all_leads, config, args.top_k)
+    else:
+        filtered = filter_leads(all_leads, config.target_roles, config.excluded_roles, config.min_email_confidence)
+        filtered_count, ranked = len(filtered), rank_leads(filtered)
 
     ordered_leads = [item.lead for item in ranked]
-    drafts = generate_emails(
-        ordered_leads,
-        config.portfolio_url,
-        config.candidate_background_summary,
-        config.tone,
-        openai_client=openai_client,
-    )
+    if args.batch_drafts:
+        if args.batch_backend == "openai":
+            backend = OpenAIBatchBackend(require_env("OPENAI_API_KEY"))
+        else:
+            backend = LocalBatchBackend(args.batch_dir)
+        result = run_batch_drafts(
+            ordered_leads,
+            backend,
+            config.openai_model,
+            config.portfolio_url,
+            config.candidate_background_summary,
+            config.tone,
+            job_dir=args.batch_dir,
+            poll_interval=args.batch_poll_seconds,
+            max_wait=args.batch_max_wait_hours * 3600,
+            log=log_action,
+        )
+        drafts = result.drafts
+        if result.job_id:
+            log_action(
+                f"Batch job {result.job_id} {result.status}: {result.generated} drafts generated, "
+                f"{result.fallbacks} template fallbacks"
+            )
+    else:
+        drafts = generate_emails(
+            ordered_leads,
+            config.portfolio_url,
+            config.candidate_background_summary,
+            config.tone,
+            openai_client=openai_client,
+            max_workers=config.draft_workers,
+            reuse=config.draft_reuse,
+        )
+    if openai_client:
+        usage = openai_client.usage()
+        log_action(
+            f"OpenAI drafts: {usage['drafts']} generated, {usage['fallbacks']} template fallbacks, "
+            f"{usage['calls']} calls ({usage['calls_saved']} saved by single-call drafts, ~{usage['tokens_saved']} tokens), "
+            f"{usage['total_tokens']} tokens"
+        )
 
     write_markdown("send_sheet.md", ranked, drafts)
     write_csv("send_sheet.csv", ranked, drafts)
@@ -106,7 +173,7 @@ def main() -> None:
             config.gmail_token_path,
         )
 
-    summary = format_summary(total_leads, len(filtered), ranked)
+    summary = format_summary(total_leads, filtered_count, ranked)
     log_action("Run complete. Summary:")
     print(summary)
     log_action("Files created: send_sheet.md, send_sheet.csv")